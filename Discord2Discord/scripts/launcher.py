@@ -42,6 +42,16 @@ def clear_logs() -> None:
             # Ignore errors if file cannot be created; proceed to next
             pass
 
+    # Drop the aggregate sidecar so log_utils rebuilds it from the reset files
+    try:
+        os.remove(os.path.join(logs_dir, 'log_stats.json'))
+    except Exception:
+        pass
+    try:
+        os.remove(os.path.join(logs_dir, 'pull_previews.json'))
+    except Exception:
+        pass
+
     print("[LAUNCHER] Logs reset in", logs_dir)
 
 
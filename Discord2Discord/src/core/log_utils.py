@@ -1,7 +1,10 @@
 import json
 import os
+import re
+import threading
 import time
-from typing import Dict, Any, Optional
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
 
 from src.core.config import DISCORD_GUILD_ID, DESTINATION_GUILD_ID
 
@@ -9,6 +12,239 @@ from src.core.config import DISCORD_GUILD_ID, DESTINATION_GUILD_ID
 FILTERED_LOGS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "logs", "filteredlogs.json")  # Amazon/Mavely/Upcoming filtered messages
 D2D_LOGS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "logs", "d2dlogs.json")            # D2D bridge webhook forwarding
 BOT_LOGS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "logs", "botlogs.json")             # Bot startup/status/terminal logs
+LOG_STATS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "logs", "log_stats.json")        # Running aggregates for /status and /startup_status
+PULL_PREVIEWS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "logs", "pull_previews.json")  # /pull_recent previews, kept out of the capped logs and stats
+
+# Mention bot facts surfaced by /startup_status (matched once per entry on write)
+_MENTION_BOT_PATTERNS = [
+    ("destination_server_id", re.compile(r"destination server:\s*(\d+)", re.IGNORECASE)),
+    ("server_name", re.compile(r"Connected to server:\s*([^\n]+)", re.IGNORECASE)),
+    ("webhook_only", re.compile(r"WEBHOOK_ONLY\]\s*(True|False)")),
+    ("ping_channels", re.compile(r"PING_CHANNELS.*?\[(.*?)\]")),
+]
+
+
+LOG_LOCK_PATH = LOG_STATS_PATH + ".lock"   # Serializes log/sidecar writes across bot processes
+_LOCK_TIMEOUT_SEC = 5.0
+_LOCK_STALE_SEC = 30.0
+
+
+@contextmanager
+def _log_write_lock():
+    """Cross-process lock held around the log + sidecar read-modify-write.
+
+    Uses an O_EXCL lock file so it works the same on Windows and POSIX; a lock
+    left behind by a crashed process is broken once it is older than
+    _LOCK_STALE_SEC. If the lock cannot be taken in time the write proceeds
+    unlocked rather than dropping the log entry.
+    """
+    fd = None
+    deadline = time.time() + _LOCK_TIMEOUT_SEC
+    while True:
+        try:
+            fd = os.open(LOG_LOCK_PATH, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, str(os.getpid()).encode("ascii"))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(LOG_LOCK_PATH) > _LOCK_STALE_SEC:
+                    os.remove(LOG_LOCK_PATH)
+                    continue
+            except OSError:
+                continue
+            if time.time() >= deadline:
+                print(f"[WARNING] Timed out waiting for {LOG_LOCK_PATH}; writing unlocked")
+                break
+            time.sleep(0.02)
+        except OSError:
+            break
+    try:
+        yield
+    finally:
+        if fd is not None:
+            try:
+                os.close(fd)
+                os.remove(LOG_LOCK_PATH)
+            except OSError:
+                pass
+
+
+def _replace_json_file(path: str, data: Any, indent: Optional[int] = 2) -> None:
+    """Atomically write JSON to path via a temp file."""
+    tmpfile = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmpfile, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent)
+    # Windows-safe replace with brief retries to avoid sharing violations
+    for _ in range(10):
+        try:
+            os.replace(tmpfile, path)
+            return
+        except Exception:
+            time.sleep(0.05)
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent)
+    except Exception:
+        pass
+    finally:
+        try:
+            os.remove(tmpfile)
+        except OSError:
+            pass
+
+
+def _empty_log_stats() -> Dict[str, Any]:
+    return {
+        "files": {},
+        "latest_timestamp": None,
+        "mention_bot": {
+            "destination_server_id": None,
+            "server_name": None,
+            "mode": None,
+            "webhook_only": None,
+            "ping_channels": [],
+            "detected": False,
+        },
+    }
+
+
+def _file_stats(items: List[Any], total_written: int = 0) -> Dict[str, Any]:
+    """Aggregates for one log file, computed over the entries it still retains."""
+    fstats = {
+        "count": 0,
+        "total_written": total_written,
+        "latest_timestamp": None,
+        "events": {},
+        "link_types": {},
+    }
+    for entry in items:
+        if not isinstance(entry, dict):
+            continue
+        fstats["count"] += 1
+        ts = entry.get("timestamp")
+        if ts:
+            ts = str(ts)
+            if fstats["latest_timestamp"] is None or ts > fstats["latest_timestamp"]:
+                fstats["latest_timestamp"] = ts
+        event = entry.get("event")
+        if event:
+            fstats["events"][str(event)] = fstats["events"].get(str(event), 0) + 1
+        link_type = entry.get("link_type")
+        if link_type:
+            fstats["link_types"][str(link_type)] = fstats["link_types"].get(str(link_type), 0) + 1
+    return fstats
+
+
+def _is_mention_bot_status(entry: Dict[str, Any]) -> bool:
+    """Only status lines (not message-derived entries) carry mention bot config facts."""
+    if entry.get("message_id"):
+        return False
+    event = str(entry.get("event") or "")
+    return not event or event.startswith("mention_bot")
+
+
+def _apply_mention_bot_facts(stats: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    """Fold mention bot config facts from a botlogs status entry into the sidecar."""
+    if not _is_mention_bot_status(entry):
+        return
+    text = str(entry.get("summary") or entry.get("content") or "")
+    if not text:
+        return
+    mb = stats["mention_bot"]
+    for key, pattern in _MENTION_BOT_PATTERNS:
+        m = pattern.search(text)
+        if not m:
+            continue
+        if key == "webhook_only":
+            mb[key] = (m.group(1) == "True")
+        elif key == "ping_channels":
+            mb[key] = [s.strip() for s in m.group(1).split(",") if s.strip()]
+        else:
+            mb[key] = m.group(1).strip()
+        mb["detected"] = True
+    if "Mention Bot Active" in text:
+        mb["mode"] = "Mention Bot Active"
+        mb["detected"] = True
+
+
+def _refresh_latest_timestamp(stats: Dict[str, Any]) -> None:
+    stamps = [f.get("latest_timestamp") for f in stats["files"].values() if f.get("latest_timestamp")]
+    stats["latest_timestamp"] = max(stamps) if stamps else None
+
+
+def _log_name(log_path: str) -> str:
+    return os.path.splitext(os.path.basename(log_path))[0]
+
+
+def _read_log_list(log_path: str) -> List[Any]:
+    try:
+        if os.path.exists(log_path):
+            with open(log_path, "r", encoding="utf-8") as f:
+                items = json.load(f)
+            if isinstance(items, list):
+                return items
+    except Exception:
+        pass
+    return []
+
+
+def _rebuild_log_stats_unlocked() -> Dict[str, Any]:
+    stats = _empty_log_stats()
+    for log_path in (FILTERED_LOGS_PATH, D2D_LOGS_PATH, BOT_LOGS_PATH):
+        items = _read_log_list(log_path)
+        if not items:
+            continue
+        name = _log_name(log_path)
+        stats["files"][name] = _file_stats(items, total_written=len(items))
+        if name == "botlogs":
+            for it in items:
+                if isinstance(it, dict):
+                    _apply_mention_bot_facts(stats, it)
+    _refresh_latest_timestamp(stats)
+    try:
+        _replace_json_file(LOG_STATS_PATH, stats, indent=None)
+    except Exception as e:
+        print(f"[WARNING] Failed to write log stats to {LOG_STATS_PATH}: {e}")
+    return stats
+
+
+def rebuild_log_stats() -> Dict[str, Any]:
+    """Recompute aggregates from the log files and persist the sidecar."""
+    with _log_write_lock():
+        return _rebuild_log_stats_unlocked()
+
+
+def _load_log_stats_unlocked() -> Optional[Dict[str, Any]]:
+    try:
+        with open(LOG_STATS_PATH, "r", encoding="utf-8") as f:
+            stats = json.load(f)
+        if isinstance(stats, dict) and "files" in stats:
+            return stats
+    except Exception:
+        pass
+    return None
+
+
+def load_log_stats() -> Dict[str, Any]:
+    """Return the running log aggregates, rebuilding them if the sidecar is missing."""
+    return _load_log_stats_unlocked() or rebuild_log_stats()
+
+
+def _update_log_stats(log_path: str, entry: Dict[str, Any], logs: List[Any]) -> None:
+    """Refresh one file's aggregates from its retained window (caller holds the write lock)."""
+    stats = _load_log_stats_unlocked()
+    if stats is None:
+        # The log file already holds the new entry, so a rebuild covers it
+        _rebuild_log_stats_unlocked()
+        return
+    name = _log_name(log_path)
+    written = int((stats["files"].get(name) or {}).get("total_written") or 0) + 1
+    stats["files"][name] = _file_stats(logs, total_written=written)
+    if name == "botlogs":
+        _apply_mention_bot_facts(stats, entry)
+    _refresh_latest_timestamp(stats)
+    _replace_json_file(LOG_STATS_PATH, stats, indent=None)
+
 
 def _write_to_log_file(log_path: str, entry: Dict[str, Any], max_entries: int = 200) -> None:
     """Write entry to a specific log file."""
@@ -38,43 +274,34 @@ def _write_to_log_file(log_path: str, entry: Dict[str, Any], max_entries: int =
             str((e.get("summary") or e.get("content") or ""))[:80],
         ])
     
-    try:
-        logs = []
-        if os.path.exists(log_path):
-            with open(log_path, "r", encoding="utf-8") as f:
-                try:
-                    logs = json.load(f)
-                except json.JSONDecodeError:
-                    logs = []
-        # Skip writing if an identical signature already exists in recent window
-        recent = logs[-50:]
-        new_sig = _sig(entry)
-        recent_sigs = { _sig(x) for x in recent }
-        if new_sig in recent_sigs:
+    # Bots run as separate processes, so the log and the sidecar are updated under one file lock
+    with _log_write_lock():
+        try:
+            logs = []
+            if os.path.exists(log_path):
+                with open(log_path, "r", encoding="utf-8") as f:
+                    try:
+                        logs = json.load(f)
+                    except json.JSONDecodeError:
+                        logs = []
+            # Skip writing if an identical signature already exists in recent window
+            recent = logs[-50:]
+            new_sig = _sig(entry)
+            recent_sigs = { _sig(x) for x in recent }
+            if new_sig in recent_sigs:
+                return
+            
+            logs.append(entry)
+            logs = logs[-max_entries:]  # Keep last N entries
+            _replace_json_file(log_path, logs)
+        except Exception as e:
+            print(f"[WARNING] Failed to write log to {log_path}: {e}")
             return
-        
-        logs.append(entry)
-        logs = logs[-max_entries:]  # Keep last N entries
-        tmpfile = log_path + ".tmp"
-        with open(tmpfile, "w", encoding="utf-8") as f:
-            json.dump(logs, f, indent=2)
-        # Windows-safe replace with brief retries to avoid sharing violations
-        replaced = False
-        for _ in range(10):
-            try:
-                os.replace(tmpfile, log_path)
-                replaced = True
-                break
-            except Exception:
-                time.sleep(0.05)
-        if not replaced:
-            try:
-                with open(log_path, "w", encoding="utf-8") as f:
-                    json.dump(logs, f, indent=2)
-            except Exception:
-                pass
-    except Exception as e:
-        print(f"[WARNING] Failed to write log to {log_path}: {e}")
+
+        try:
+            _update_log_stats(log_path, entry, logs)
+        except Exception as e:
+            print(f"[WARNING] Failed to update log stats: {e}")
 
 def write_filtered_log(entry: Dict[str, Any]) -> None:
     """Write to filtered logs (Amazon, Mavely, Upcoming messages)."""
@@ -89,6 +316,45 @@ def write_bot_log(entry: Dict[str, Any]) -> None:
     _write_to_log_file(BOT_LOGS_PATH, entry)
 
 
+def write_pull_previews(previews: Dict[str, List[Dict[str, Any]]]) -> int:
+    """Replace the stored preview messages of each given source channel.
+
+    Previews live in their own file keyed by channel, so pulling them never
+    evicts real log entries or shows up in the log stats.
+    """
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    written = 0
+    with _log_write_lock():
+        try:
+            with open(PULL_PREVIEWS_PATH, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if not isinstance(stored, dict):
+                stored = {}
+        except Exception:
+            stored = {}
+        for channel_id, entries in previews.items():
+            stored[str(channel_id)] = [dict(e, timestamp=stamp) for e in entries]
+            written += len(entries)
+        try:
+            _replace_json_file(PULL_PREVIEWS_PATH, stored)
+        except Exception as e:
+            print(f"[WARNING] Failed to write previews to {PULL_PREVIEWS_PATH}: {e}")
+            return 0
+    return written
+
+
+def read_pull_previews() -> List[Dict[str, Any]]:
+    """All stored previews as a flat list, in the same shape as log entries."""
+    try:
+        with open(PULL_PREVIEWS_PATH, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+    except Exception:
+        return []
+    if not isinstance(stored, dict):
+        return []
+    return [e for entries in stored.values() if isinstance(entries, list) for e in entries if isinstance(e, dict)]
+
+
 def write_enhanced_log(
     message_id: str,
     source_channel_id: int,
@@ -1,18 +1,30 @@
 #!/usr/bin/env python3
 """Working HTTP Server for Dashboard with all endpoints functioning"""
+import bisect
+import gzip
 import http.server
 import socketserver
 import signal
 import sys
 import os
 import json
+import re
+import threading
+import time
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 import requests
 
+try:
+    # Optional: brotli is preferred over gzip when installed (pip install brotli)
+    import brotli  # type: ignore
+except Exception:
+    brotli = None
+
 # Load config for tokens and channel map
 try:
     from src.core.config import DISCORD_TOKEN, SOURCE_GUILD_ID, MENTION_BOT_TOKEN, DESTINATION_GUILD_ID, load_channel_map
-    from src.core.log_utils import write_enhanced_log
+    from src.core.log_utils import write_enhanced_log, load_log_stats, write_pull_previews, read_pull_previews
 except Exception:
     DISCORD_TOKEN = ""
     SOURCE_GUILD_ID = ""
@@ -25,10 +37,596 @@ except Exception:
             return {}
     def write_enhanced_log(**kwargs):
         pass
+    def write_pull_previews(previews):
+        return 0
+    def read_pull_previews():
+        return []
+    def load_log_stats():
+        # Read the sidecar maintained by log_utils directly
+        try:
+            root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            with open(os.path.join(root, 'logs', 'log_stats.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
     MENTION_BOT_TOKEN = ""
     DESTINATION_GUILD_ID = ""
 
+DISCORD_API = 'https://discord.com/api/v9'
+CHANNELS_META_TTL = int(os.getenv('CHANNELS_META_TTL', '300') or 300)
+DISCORD_API_WORKERS = 8
+_WEBHOOK_RE = re.compile(r"/webhooks/(\d+)/([\w-]+)")
+
+# Shared pool for concurrent Discord REST lookups (webhooks, channel history, guild channels)
+DISCORD_POOL = ThreadPoolExecutor(max_workers=DISCORD_API_WORKERS, thread_name_prefix='discord-api')
+
+
+def read_channel_map_file() -> dict:
+    """Load config/channel_map.json as a raw dict (tolerant of BOM)."""
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    map_path = os.path.join(root, 'config', 'channel_map.json')
+    channel_map = {}
+    if os.path.exists(map_path):
+        try:
+            with open(map_path, 'r', encoding='utf-8-sig') as f:
+                channel_map = json.load(f)
+        except Exception:
+            try:
+                with open(map_path, 'r', encoding='utf-8') as f:
+                    channel_map = json.load(f)
+            except Exception:
+                channel_map = {}
+    return channel_map if isinstance(channel_map, dict) else {}
+
+
+class ChannelsMetaService:
+    """Cached /channels_meta payload.
+
+    Webhook lookups run concurrently and are cached per URL; the assembled
+    payload is served from memory and refreshed in the background once stale.
+    """
+
+    def __init__(self, ttl: int = CHANNELS_META_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._building = False
+        self._generation = 0      # bumped by invalidate(); a build only stores if it still matches
+        self._payload = None
+        self._built_at = 0.0
+        self._webhook_cache = {}  # webhook_url -> (resolved_at, dest_channel_id)
+
+    def get(self) -> dict:
+        with self._lock:
+            payload = self._payload
+            stale = (time.time() - self._built_at) >= self.ttl
+        if payload is None:
+            return self.refresh()
+        if stale:
+            self.refresh_async()
+        return payload
+
+    def invalidate(self) -> None:
+        """Drop the assembled payload (webhook lookups stay cached by URL).
+
+        A build already in flight read the old channel map; bumping the
+        generation makes it discard its result and build again.
+        """
+        with self._lock:
+            self._generation += 1
+            self._payload = None
+            self._built_at = 0.0
+        self.refresh_async()
+
+    def refresh_async(self) -> None:
+        with self._lock:
+            if self._building:
+                return
+        threading.Thread(target=self._refresh_quietly, daemon=True).start()
+
+    def _refresh_quietly(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"[HTTP] channels_meta refresh failed: {e}")
+
+    def refresh(self) -> dict:
+        """Build and store the payload; concurrent callers share one build."""
+        with self._cond:
+            if self._building:
+                while self._building:
+                    self._cond.wait()
+                if self._payload is not None:
+                    return self._payload
+            self._building = True
+        try:
+            while True:
+                with self._lock:
+                    generation = self._generation
+                payload = self._build()
+                with self._lock:
+                    if generation == self._generation:
+                        self._payload = payload
+                        self._built_at = time.time()
+                        return payload
+        finally:
+            with self._cond:
+                self._building = False
+                self._cond.notify_all()
+
+    def start_background_refresh(self) -> None:
+        def _loop():
+            while True:
+                self._refresh_quietly()
+                time.sleep(max(30, self.ttl))
+        threading.Thread(target=_loop, name='channels-meta-refresh', daemon=True).start()
+
+    def _resolve_webhook(self, webhook_url: str):
+        now = time.time()
+        with self._lock:
+            cached = self._webhook_cache.get(webhook_url)
+        if cached and now - cached[0] < self.ttl:
+            return cached[1]
+        dest_cid = None
+        m = _WEBHOOK_RE.search(str(webhook_url))
+        if m:
+            wh_id, wh_token = m.group(1), m.group(2)
+            try:
+                info_resp = requests.get(f"{DISCORD_API}/webhooks/{wh_id}/{wh_token}", timeout=5)
+                if info_resp.status_code == 200:
+                    dest_cid = str(info_resp.json().get('channel_id') or '') or None
+                elif cached:
+                    # Keep the previous answer through transient failures
+                    dest_cid = cached[1]
+            except Exception:
+                dest_cid = cached[1] if cached else None
+        with self._lock:
+            self._webhook_cache[webhook_url] = (now, dest_cid)
+        return dest_cid
+
+    def _build(self) -> dict:
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        channel_map = read_channel_map_file()
+
+        # Start webhook lookups first so they overlap with the guild fetch below
+        webhook_futures = {
+            str(src_id_str): (webhook_url, DISCORD_POOL.submit(self._resolve_webhook, webhook_url))
+            for src_id_str, webhook_url in channel_map.items()
+        }
+
+        # Build id->name map from logs (best effort)
+        id_to_name = {}
+        for lf in ['filteredlogs.json', 'd2dlogs.json', 'botlogs.json']:
+            logs_path = os.path.join(root, 'logs', lf)
+            if not os.path.exists(logs_path):
+                continue
+            try:
+                with open(logs_path, 'r', encoding='utf-8') as f:
+                    items = json.load(f)
+                if not isinstance(items, list):
+                    continue
+                for it in items:
+                    sid = it.get('source_channel_id')
+                    sname = it.get('source_channel_name')
+                    did = it.get('dest_channel_id')
+                    dname = it.get('dest_channel_name')
+                    # Only accept non-numeric names
+                    if sid and sname and not str(sname).isnumeric():
+                        id_to_name[str(sid)] = sname
+                    if did and dname and not str(dname).isnumeric():
+                        id_to_name[str(did)] = dname
+            except Exception:
+                continue
+
+        # Enrich with DESTINATION guild channels (preferred for names)
+        try:
+            if MENTION_BOT_TOKEN and DESTINATION_GUILD_ID:
+                headers = {
+                    'Authorization': f'Bot {MENTION_BOT_TOKEN}',
+                    'User-Agent': 'RS-Dashboard/1.0'
+                }
+                url = f'{DISCORD_API}/guilds/{DESTINATION_GUILD_ID}/channels'
+                r = requests.get(url, headers=headers, timeout=5)
+                if r.status_code == 200:
+                    for ch in r.json():
+                        cid = str(ch.get('id'))
+                        cname = ch.get('name')
+                        if cid and cname:
+                            id_to_name[cid] = cname
+        except Exception:
+            pass
+
+        # Build destination-centric view using webhook metadata
+        destinations = {}
+        for src_id_str, (webhook_url, fut) in webhook_futures.items():
+            try:
+                dest_cid = fut.result()
+            except Exception:
+                dest_cid = None
+            key = dest_cid or f"webhook:{str(webhook_url)[:18]}..."
+            bucket = destinations.setdefault(key, {
+                'id': dest_cid,
+                'name': id_to_name.get(dest_cid, f"# {dest_cid[-6:]}" if dest_cid else 'Webhook Target'),
+                'sources': []
+            })
+            bucket['sources'].append({'source_channel_id': src_id_str, 'webhook': webhook_url})
+
+        # Legacy categories for backward compatibility (kept)
+        all_ids = set([str(k) for k in channel_map.keys()]) | set(id_to_name.keys())
+        mapped = []
+        unmapped = []
+        for cid in sorted(all_ids):
+            name = id_to_name.get(str(cid)) or f"# {str(cid)[-6:]}"
+            entry = {
+                'id': str(cid),
+                'name': name,
+                'in_map': str(cid) in channel_map
+            }
+            if entry['in_map']:
+                mapped.append(entry)
+            else:
+                unmapped.append(entry)
+
+        return {
+            'destinations': [v for _, v in destinations.items()],
+            'categories': [
+                {'name': 'Mapped', 'channels': mapped},
+                {'name': 'Unmapped', 'channels': unmapped}
+            ]
+        }
+
+
+CHANNELS_META = ChannelsMetaService()
+
+# ================= Dashboard "pull" actions =================
+PULL_CACHE_TTL = int(os.getenv('PULL_CACHE_TTL', '15') or 15)
+PULL_MAX_LIMIT = 50
+
+
+class TTLCache:
+    """Small response cache with per-key single-flight so concurrent tabs share one fetch.
+
+    Expired values are dropped whenever a new value is stored, and a key's
+    lock only lives while someone is waiting on it, so the cache stays as
+    small as the set of keys fetched within the last TTL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}  # key -> (expires_at, value)
+        self._key_locks = {}  # key -> [lock, waiters]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._values)
+
+    def get_or_compute(self, key, ttl: float, compute):
+        with self._lock:
+            hit = self._values.get(key)
+            if hit and hit[0] > time.time():
+                return hit[1], True
+            key_lock = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            key_lock[1] += 1
+        try:
+            with key_lock[0]:
+                with self._lock:
+                    hit = self._values.get(key)
+                    if hit and hit[0] > time.time():
+                        return hit[1], True
+                value = compute()
+                with self._lock:
+                    now = time.time()
+                    for k in [k for k, (exp, _) in self._values.items() if exp <= now]:
+                        del self._values[k]
+                    self._values[key] = (now + ttl, value)
+                return value, False
+        finally:
+            with self._lock:
+                key_lock[1] -= 1
+                if not key_lock[1]:
+                    self._key_locks.pop(key, None)
+
+
+PULL_CACHE = TTLCache()
+
+
+def _discord_auth_candidates():
+    """Authorization headers to try, bot token first, then the bridge's user token."""
+    candidates = []
+    if MENTION_BOT_TOKEN:
+        candidates.append(f'Bot {MENTION_BOT_TOKEN}')
+    if DISCORD_TOKEN:
+        candidates.append(DISCORD_TOKEN)
+    return candidates
+
+
+def discord_api_get(path: str, params: dict = None):
+    """GET a Discord API path with whichever configured token has access; returns JSON or raises."""
+    auths = _discord_auth_candidates()
+    if not auths:
+        raise RuntimeError('No DISCORD_TOKEN or MENTION_BOT_TOKEN configured')
+    last_error = None
+    for auth in auths:
+        r = requests.get(f'{DISCORD_API}{path}', params=params, timeout=8,
+                         headers={'Authorization': auth, 'User-Agent': 'RS-Dashboard/1.0'})
+        if r.status_code == 200:
+            return r.json()
+        last_error = f'HTTP {r.status_code}: {r.text[:200]}'
+        if r.status_code not in (401, 403, 404):
+            break
+    raise RuntimeError(last_error or 'Discord API request failed')
+
+
+def pull_recent_messages(limit: int) -> dict:
+    """Fetch the latest messages of every mapped source channel concurrently and store them as previews."""
+    channel_map = read_channel_map_file()
+    channel_ids = [str(k) for k in channel_map.keys()]
+    names = {}
+    try:
+        for cat in CHANNELS_META.get().get('categories', []):
+            for ch in cat.get('channels', []):
+                names[str(ch.get('id'))] = ch.get('name')
+    except Exception:
+        pass
+
+    def _fetch(cid):
+        try:
+            return cid, discord_api_get(f'/channels/{cid}/messages', {'limit': limit}), None
+        except Exception as e:
+            return cid, [], str(e)[:200]
+
+    previews = {}
+    errors = {}
+    for cid, messages, err in DISCORD_POOL.map(_fetch, channel_ids):
+        if err:
+            errors[cid] = err
+            continue
+        # Oldest first so the preview order matches Discord
+        entries = []
+        for msg in reversed(messages or []):
+            content = msg.get('content') or ('[embed/attachment]' if (msg.get('embeds') or msg.get('attachments')) else '')
+            entries.append({
+                'message_id': str(msg.get('id')),
+                'source_channel_id': cid,
+                'source_channel_name': names.get(cid) or cid,
+                'content': content[:200] + '...' if len(content) > 200 else content,
+                'event': 'pull_recent',
+            })
+        previews[cid] = entries
+    # Previews get their own store so they neither evict real log entries nor skew log stats
+    written = write_pull_previews(previews)
+    return {
+        'success': True,
+        'written': written,
+        'channels': len(channel_ids),
+        'errors': errors,
+    }
+
+
+def pull_guild_channels(src_guild: str, dest_guild: str) -> dict:
+    """Fetch text channel lists for the source and destination guilds concurrently."""
+    def _fetch(guild_id):
+        data = discord_api_get(f'/guilds/{guild_id}/channels')
+        return sorted(
+            ({'id': str(ch.get('id')), 'name': ch.get('name') or '', 'parent_id': ch.get('parent_id'),
+              'position': ch.get('position', 0)} for ch in data if ch.get('type') in (0, 5)),
+            key=lambda ch: (ch['position'], ch['name']),
+        )
+
+    src_future = DISCORD_POOL.submit(_fetch, src_guild)
+    dest_future = DISCORD_POOL.submit(_fetch, dest_guild)
+    source, destination = src_future.result(), dest_future.result()
+    return {
+        'success': True,
+        'count': len(source),
+        'source': source,
+        'destination': destination,
+    }
+
+# ================= Response compression =================
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024') or 1024)
+_COMPRESSIBLE_EXTS = {'.html', '.htm', '.js', '.css', '.json', '.svg', '.txt', '.md'}
+
+
+def negotiate_encoding(accept_encoding: str):
+    """Pick 'br' or 'gzip' from an Accept-Encoding header, or None."""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    wildcard = accepted.get('*', 0.0)
+    if brotli is not None and accepted.get('br', wildcard) > 0:
+        return 'br'
+    if accepted.get('gzip', wildcard) > 0:
+        return 'gzip'
+    return None
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+class StaticAssetCache:
+    """In-memory precompressed copies of static files, invalidated by mtime/size."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # path -> (mtime_ns, size, {encoding: bytes})
+
+    def get(self, path: str, encoding: str):
+        st = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                body = entry[2].get(encoding)
+                if body is not None:
+                    return body, st
+            else:
+                entry = (st.st_mtime_ns, st.st_size, {})
+                self._entries[path] = entry
+        with open(path, 'rb') as f:
+            body = compress_bytes(f.read(), encoding)
+        with self._lock:
+            entry[2][encoding] = body
+        return body, st
+
+
+STATIC_ASSETS = StaticAssetCache()
+
+# ================= Log query index =================
+LOG_TYPES = ('filteredlogs', 'd2dlogs', 'botlogs')
+LOG_QUERY_FIELDS = ('log_type', 'event', 'link_type', 'source_channel_id', 'dest_channel_id', 'success')
+LOG_QUERY_MAX_PAGE_SIZE = 500
+
+
+class LogQueryIndex:
+    """Time-ordered index over the JSON log files for /logs/query.
+
+    Rebuilt only when a log file's mtime/size changes; lookups intersect
+    per-field posting sets and bisect the sorted timestamps for ranges.
+    """
+
+    def __init__(self, logs_dir: str):
+        self.logs_dir = logs_dir
+        self._lock = threading.Lock()
+        self._stamps = {}
+        self._entries = []
+        self._timestamps = []
+        self._postings = {field: {} for field in LOG_QUERY_FIELDS}
+
+    @staticmethod
+    def _norm(field: str, value) -> str:
+        if field == 'success':
+            return 'true' if str(value).strip().lower() in {'1', 'true', 'yes', 'on'} else 'false'
+        return str(value).strip()
+
+    def _current_stamps(self) -> dict:
+        stamps = {}
+        for log_type in LOG_TYPES:
+            try:
+                st = os.stat(os.path.join(self.logs_dir, f'{log_type}.json'))
+                stamps[log_type] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                stamps[log_type] = None
+        return stamps
+
+    def _rebuild(self, stamps: dict) -> None:
+        entries = []
+        for log_type in LOG_TYPES:
+            try:
+                with open(os.path.join(self.logs_dir, f'{log_type}.json'), 'r', encoding='utf-8') as f:
+                    items = json.load(f)
+            except Exception:
+                continue
+            if not isinstance(items, list):
+                continue
+            for it in items:
+                if isinstance(it, dict):
+                    entries.append(dict(it, log_type=log_type))
+        # Stable sort keeps file order for identical timestamps
+        entries.sort(key=lambda e: str(e.get('timestamp') or ''))
+        postings = {field: {} for field in LOG_QUERY_FIELDS}
+        for pos, e in enumerate(entries):
+            for field in LOG_QUERY_FIELDS:
+                value = e.get(field)
+                if value is None or value == '':
+                    continue
+                postings[field].setdefault(self._norm(field, value), set()).add(pos)
+        self._entries = entries
+        self._timestamps = [str(e.get('timestamp') or '') for e in entries]
+        self._postings = postings
+        self._stamps = stamps
+
+    def query(self, filters: dict, since: str = '', until: str = '', page: int = 1, page_size: int = 50) -> dict:
+        """filters: field -> list of accepted values (OR within a field, AND across fields)."""
+        with self._lock:
+            stamps = self._current_stamps()
+            if stamps != self._stamps:
+                self._rebuild(stamps)
+            lo = bisect.bisect_left(self._timestamps, since) if since else 0
+            # 'until' is inclusive and may be a prefix such as '2025-10-28'
+            hi = bisect.bisect_right(self._timestamps, until + '\uffff') if until else len(self._timestamps)
+            candidates = None
+            for field, values in filters.items():
+                matched = set()
+                for v in values:
+                    matched |= self._postings.get(field, {}).get(self._norm(field, v), set())
+                candidates = matched if candidates is None else (candidates & matched)
+            if candidates is None:
+                positions = range(hi - 1, lo - 1, -1)
+            else:
+                positions = sorted((p for p in candidates if lo <= p < hi), reverse=True)
+            total = len(positions)
+            start = (page - 1) * page_size
+            logs = [self._entries[p] for p in positions[start:start + page_size]]
+        return {
+            'success': True,
+            'logs': logs,
+            'total': total,
+            'page': page,
+            'page_size': page_size,
+            'has_more': start + len(logs) < total,
+        }
+
+
+LOG_INDEX = LogQueryIndex(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'logs'))
+
 class WorkingHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    def _send_json_payload(self, status, payload: bytes, no_store: bool = True):
+        """Send a JSON body, compressed when large enough and accepted by the client."""
+        encoding = None
+        if len(payload) >= COMPRESS_MIN_BYTES:
+            encoding = negotiate_encoding(self.headers.get('Accept-Encoding', ''))
+            if encoding:
+                payload = compress_bytes(payload, encoding)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        if no_store:
+            self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate, max-age=0')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_static_compressed(self) -> bool:
+        """Serve text assets (dashboard.html, script.js, ...) from the precompressed cache.
+
+        Returns False when the request should fall through to SimpleHTTPRequestHandler.
+        """
+        path = self.translate_path(self.path)
+        if os.path.splitext(path)[1].lower() not in _COMPRESSIBLE_EXTS or not os.path.isfile(path):
+            return False
+        encoding = negotiate_encoding(self.headers.get('Accept-Encoding', ''))
+        if not encoding:
+            return False
+        try:
+            body, st = STATIC_ASSETS.get(path, encoding)
+        except OSError:
+            return False
+        self.send_response(200)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Last-Modified', self.date_time_string(int(st.st_mtime)))
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return True
+
     def do_POST(self):
         print(f"[HTTP] POST request to: {self.path}")
         if self.path == '/shutdown':
@@ -90,6 +688,7 @@ class WorkingHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                     channel_map_path = os.path.join(root, 'config', 'channel_map.json')
                     with open(channel_map_path, 'w', encoding='utf-8-sig') as f:
                         json.dump(channel_map_data, f, indent=2, ensure_ascii=False)
+                    CHANNELS_META.invalidate()
                     self.send_response(200)
                     self.send_header('Content-Type', 'application/json')
                     self.end_headers()
@@ -132,29 +731,10 @@ class WorkingHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                         except Exception:
                             map_len = 0
 
-                # Aggregate JSON-based logs information
-                log_files = [
-                    os.path.join(root, 'logs', 'filteredlogs.json'),
-                    os.path.join(root, 'logs', 'd2dlogs.json'),
-                    os.path.join(root, 'logs', 'botlogs.json'),
-                ]
-                logs_count = 0
-                latest_ts = None
-                for lf in log_files:
-                    if os.path.exists(lf):
-                        try:
-                            with open(lf, 'r', encoding='utf-8') as f:
-                                items = json.load(f)
-                                if isinstance(items, list):
-                                    logs_count += len(items)
-                                    # Find newest timestamp string
-                                    for it in items:
-                                        ts = it.get('timestamp')
-                                        if ts:
-                                            if latest_ts is None or str(ts) > str(latest_ts):
-                                                latest_ts = ts
-                        except Exception:
-                            pass
+                # Aggregates are maintained by log_utils on every write
+                stats = load_log_stats() or {}
+                logs_count = sum(int(f.get('count') or 0) for f in (stats.get('files') or {}).values())
+                latest_ts = stats.get('latest_timestamp')
 
                 status_data = {
                     'channel_map_exists': map_exists,
@@ -166,12 +746,7 @@ class WorkingHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                 }
 
                 payload = json.dumps(status_data, ensure_ascii=False).encode('utf-8')
-                self.send_response(200)
-                self.send_header('Content-Type', 'application/json; charset=utf-8')
-                self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate, max-age=0')
-                self.send_header('Content-Length', str(len(payload)))
-                self.end_headers()
-                self.wfile.write(payload)
+                self._send_json_payload(200, payload)
                 return
             except Exception as e:
                 self.send_response(500)
@@ -210,12 +785,7 @@ class WorkingHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                         'success': True
                     }, ensure_ascii=False).encode('utf-8')
                     
-                    self.send_response(200)
-                    self.send_header('Content-Type', 'application/json; charset=utf-8')
-                    self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate, max-age=0')
-                    self.send_header('Content-Length', str(len(payload)))
-                    self.end_headers()
-                    self.wfile.write(payload)
+                    self._send_json_payload(200, payload)
                 else:
                     payload = json.dumps({
                         'logs': [],
@@ -224,12 +794,7 @@ class WorkingHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                         'error': f'{log_type} logs not found'
                     }, ensure_ascii=False).encode('utf-8')
                     
-                    self.send_response(200)
-                    self.send_header('Content-Type', 'application/json; charset=utf-8')
-                    self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate, max-age=0')
-                    self.send_header('Content-Length', str(len(payload)))
-                    self.end_headers()
-                    self.wfile.write(payload)
+                    self._send_json_payload(200, payload)
                 return
             except Exception as e:
                 payload = json.dumps({
@@ -238,12 +803,61 @@ class WorkingHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                     'error': str(e)
                 }, ensure_ascii=False).encode('utf-8')
                 
-                self.send_response(500)
-                self.send_header('Content-Type', 'application/json; charset=utf-8')
-                self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate, max-age=0')
-                self.send_header('Content-Length', str(len(payload)))
-                self.end_headers()
-                self.wfile.write(payload)
+                self._send_json_payload(500, payload)
+                return
+
+        elif self.path.startswith('/pull_previews.json'):
+            try:
+                payload = json.dumps({
+                    'logs': read_pull_previews(),
+                    'log_type': 'pull_previews',
+                    'success': True
+                }, ensure_ascii=False).encode('utf-8')
+                self._send_json_payload(200, payload)
+                return
+            except Exception as e:
+                payload = json.dumps({
+                    'logs': [],
+                    'success': False,
+                    'error': str(e)
+                }, ensure_ascii=False).encode('utf-8')
+                self._send_json_payload(500, payload)
+                return
+
+        elif self.path.startswith('/logs/query'):
+            try:
+                parsed = urllib.parse.urlparse(self.path)
+                params = urllib.parse.parse_qs(parsed.query)
+                # Short aliases used by the dashboard filters
+                aliases = {'source': 'source_channel_id', 'dest': 'dest_channel_id'}
+                filters = {}
+                for key, values in params.items():
+                    field = aliases.get(key, key)
+                    if field not in LOG_QUERY_FIELDS:
+                        continue
+                    vals = [v.strip() for raw in values for v in raw.split(',') if v.strip()]
+                    if vals:
+                        filters[field] = vals
+                try:
+                    page = max(1, int(params.get('page', ['1'])[0]))
+                    page_size = int(params.get('page_size', ['50'])[0])
+                except ValueError:
+                    raise ValueError('page and page_size must be integers')
+                page_size = min(max(1, page_size), LOG_QUERY_MAX_PAGE_SIZE)
+                since = params.get('since', [''])[0].strip()
+                until = params.get('until', [''])[0].strip()
+
+                response = LOG_INDEX.query(filters, since=since, until=until, page=page, page_size=page_size)
+                payload = json.dumps(response, ensure_ascii=False).encode('utf-8')
+                self._send_json_payload(200, payload)
+                return
+            except ValueError as e:
+                payload = json.dumps({'success': False, 'error': str(e)}, ensure_ascii=False).encode('utf-8')
+                self._send_json_payload(400, payload, no_store=False)
+                return
+            except Exception as e:
+                payload = json.dumps({'success': False, 'error': str(e)}, ensure_ascii=False).encode('utf-8')
+                self._send_json_payload(500, payload, no_store=False)
                 return
 
         elif self.path.startswith('/channel_map.json'):
@@ -259,12 +873,7 @@ class WorkingHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                         with open(map_path, 'r', encoding='utf-8') as f:
                             data = json.load(f)
                 payload = json.dumps(data or {}, ensure_ascii=False).encode('utf-8')
-                self.send_response(200)
-                self.send_header('Content-Type', 'application/json; charset=utf-8')
-                self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate, max-age=0')
-                self.send_header('Content-Length', str(len(payload)))
-                self.end_headers()
-                self.wfile.write(payload)
+                self._send_json_payload(200, payload)
                 return
             except Exception:
                 self.send_response(500)
@@ -278,167 +887,55 @@ class WorkingHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                 # Parse query parameters
                 parsed = urllib.parse.urlparse(self.path)
                 params = urllib.parse.parse_qs(parsed.query)
-                src_server = params.get('src', [''])[0]
-                dest_server = params.get('dest', [''])[0]
-                
-                # Phase 1: Placeholder implementation (returns mock count)
-                # Phase 2: Will integrate Discord API to fetch channels
-                count = len(src_server) + len(dest_server) if src_server and dest_server else 0
-                
-                response = {
-                    'success': True,
-                    'count': count,
-                    'message': f'Pull channels from {src_server} to {dest_server} (placeholder)',
-                    'note': 'Phase 1: Mock implementation. Phase 2 will integrate Discord API.'
-                }
-                
-                payload = json.dumps(response, ensure_ascii=False).encode('utf-8')
-                self.send_response(200)
-                self.send_header('Content-Type', 'application/json; charset=utf-8')
-                self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate, max-age=0')
-                self.send_header('Content-Length', str(len(payload)))
-                self.end_headers()
-                self.wfile.write(payload)
+                src_server = params.get('src', [''])[0].strip()
+                dest_server = params.get('dest', [''])[0].strip()
+                if not (src_server.isdigit() and dest_server.isdigit()):
+                    payload = json.dumps({'success': False, 'error': 'src and dest must be numeric server IDs'}).encode('utf-8')
+                    self._send_json_payload(400, payload, no_store=False)
+                    return
+
+                response, cached = PULL_CACHE.get_or_compute(
+                    ('channels', src_server, dest_server), PULL_CACHE_TTL,
+                    lambda: pull_guild_channels(src_server, dest_server),
+                )
+                payload = json.dumps(dict(response, cached=cached), ensure_ascii=False).encode('utf-8')
+                self._send_json_payload(200, payload)
                 return
             except Exception as e:
                 payload = json.dumps({
                     'success': False,
                     'error': str(e)
                 }, ensure_ascii=False).encode('utf-8')
-                self.send_response(500)
-                self.send_header('Content-Type', 'application/json; charset=utf-8')
-                self.send_header('Content-Length', str(len(payload)))
-                self.end_headers()
-                self.wfile.write(payload)
+                self._send_json_payload(500, payload, no_store=False)
                 return
 
-        elif self.path.startswith('/channels_meta'):
+        elif self.path.startswith('/pull_recent'):
             try:
-                root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-                map_path = os.path.join(root, 'config', 'channel_map.json')
-
-                # Load map (tolerant of BOM)
-                channel_map = {}
-                if os.path.exists(map_path):
-                    try:
-                        with open(map_path, 'r', encoding='utf-8-sig') as f:
-                            channel_map = json.load(f)
-                    except Exception:
-                        try:
-                            with open(map_path, 'r', encoding='utf-8') as f:
-                                channel_map = json.load(f)
-                        except Exception:
-                            channel_map = {}
-
-                # Build id->name map from logs (best effort)
-                id_to_name = {}
-                for lf in ['filteredlogs.json', 'd2dlogs.json', 'botlogs.json']:
-                    logs_path = os.path.join(root, 'logs', lf)
-                    if not os.path.exists(logs_path):
-                        continue
-                    try:
-                        with open(logs_path, 'r', encoding='utf-8') as f:
-                            items = json.load(f)
-                        if not isinstance(items, list):
-                            continue
-                        for it in items:
-                            sid = it.get('source_channel_id')
-                            sname = it.get('source_channel_name')
-                            did = it.get('dest_channel_id')
-                            dname = it.get('dest_channel_name')
-                            if sid and sname:
-                                try:
-                                    # Only accept non-numeric names
-                                    if not str(sname).isnumeric():
-                                        id_to_name[str(sid)] = sname
-                                except Exception:
-                                    id_to_name[str(sid)] = sname
-                            if did and dname:
-                                try:
-                                    if not str(dname).isnumeric():
-                                        id_to_name[str(did)] = dname
-                                except Exception:
-                                    id_to_name[str(did)] = dname
-                    except Exception:
-                        continue
-
-                # Enrich with DESTINATION guild channels (preferred for names)
+                parsed = urllib.parse.urlparse(self.path)
+                params = urllib.parse.parse_qs(parsed.query)
                 try:
-                    if MENTION_BOT_TOKEN and DESTINATION_GUILD_ID:
-                        headers = {
-                            'Authorization': f'Bot {MENTION_BOT_TOKEN}',
-                            'User-Agent': 'RS-Dashboard/1.0'
-                        }
-                        url = f'https://discord.com/api/v9/guilds/{DESTINATION_GUILD_ID}/channels'
-                        r = requests.get(url, headers=headers, timeout=5)
-                        if r.status_code == 200:
-                            for ch in r.json():
-                                cid = str(ch.get('id'))
-                                cname = ch.get('name')
-                                if cid and cname:
-                                    id_to_name[cid] = cname
-                except Exception:
-                    pass
-
-                # Build destination-centric view using webhook metadata
-                destinations = {}
-                for src_id_str, webhook_url in (channel_map or {}).items():
-                    try:
-                        # Extract webhook id and token
-                        import re as _re
-                        m = _re.search(r"/webhooks/(\d+)/(\w+)", str(webhook_url))
-                        dest_cid = None
-                        if m:
-                            wh_id, wh_token = m.group(1), m.group(2)
-                            info_url = f"https://discord.com/api/v9/webhooks/{wh_id}/{wh_token}"
-                            try:
-                                info_resp = requests.get(info_url, timeout=5)
-                                if info_resp.status_code == 200:
-                                    info = info_resp.json()
-                                    dest_cid = str(info.get('channel_id') or '') or None
-                            except Exception:
-                                dest_cid = None
-                        key = dest_cid or f"webhook:{str(webhook_url)[:18]}..."
-                        bucket = destinations.setdefault(key, {
-                            'id': dest_cid,
-                            'name': id_to_name.get(dest_cid, f"# {dest_cid[-6:]}" if dest_cid else 'Webhook Target'),
-                            'sources': []
-                        })
-                        bucket['sources'].append({'source_channel_id': str(src_id_str), 'webhook': webhook_url})
-                    except Exception:
-                        continue
+                    limit = int(params.get('limit', ['5'])[0])
+                except ValueError:
+                    limit = 5
+                limit = min(max(1, limit), PULL_MAX_LIMIT)
+
+                response, cached = PULL_CACHE.get_or_compute(
+                    ('recent', limit), PULL_CACHE_TTL, lambda: pull_recent_messages(limit),
+                )
+                payload = json.dumps(dict(response, cached=cached), ensure_ascii=False).encode('utf-8')
+                self._send_json_payload(200, payload)
+                return
+            except Exception as e:
+                payload = json.dumps({'success': False, 'error': str(e)}, ensure_ascii=False).encode('utf-8')
+                self._send_json_payload(500, payload, no_store=False)
+                return
 
-                # Legacy categories for backward compatibility (kept)
-                all_ids = set([str(k) for k in channel_map.keys()]) | set(id_to_name.keys())
-                mapped = []
-                unmapped = []
-                for cid in sorted(all_ids):
-                    name = id_to_name.get(str(cid)) or f"# {str(cid)[-6:]}"
-                    entry = {
-                        'id': str(cid),
-                        'name': name,
-                        'in_map': str(cid) in channel_map
-                    }
-                    if entry['in_map']:
-                        mapped.append(entry)
-                    else:
-                        unmapped.append(entry)
-
-                response = {
-                    'destinations': [v for _, v in destinations.items()],
-                    'categories': [
-                        {'name': 'Mapped', 'channels': mapped},
-                        {'name': 'Unmapped', 'channels': unmapped}
-                    ]
-                }
+        elif self.path.startswith('/channels_meta'):
+            try:
+                response = CHANNELS_META.get()
 
                 payload = json.dumps(response, ensure_ascii=False).encode('utf-8')
-                self.send_response(200)
-                self.send_header('Content-Type', 'application/json; charset=utf-8')
-                self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate, max-age=0')
-                self.send_header('Content-Length', str(len(payload)))
-                self.end_headers()
-                self.wfile.write(payload)
+                self._send_json_payload(200, payload)
                 return
             except Exception as e:
                 self.send_response(500)
@@ -456,106 +953,41 @@ class WorkingHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                 except Exception:
                     channel_map = {}
 
-                # Helper to load json logs safely
-                def load_json_list(p):
-                    try:
-                        if os.path.exists(p):
-                            with open(p, 'r', encoding='utf-8') as f:
-                                data = json.load(f)
-                            return data if isinstance(data, list) else []
-                    except Exception:
-                        return []
-                    return []
-
-                botlogs = load_json_list(os.path.join(root, 'logs', 'botlogs.json'))
-                d2dlogs = load_json_list(os.path.join(root, 'logs', 'd2dlogs.json'))
-                filteredlogs = load_json_list(os.path.join(root, 'logs', 'filteredlogs.json'))
-
-                import re
+                stats = load_log_stats() or {}
+                files = stats.get('files') or {}
+                mention_bot = {
+                    'destination_server_id': None,
+                    'server_name': None,
+                    'mode': None,
+                    'webhook_only': None,
+                    'ping_channels': [],
+                    'detected': False
+                }
+                mention_bot.update(stats.get('mention_bot') or {})
                 status = {
-                    'mention_bot': {
-                        'destination_server_id': None,
-                        'server_name': None,
-                        'mode': None,
-                        'webhook_only': None,
-                        'ping_channels': [],
-                        'detected': False
-                    },
+                    'mention_bot': mention_bot,
                     'd2d': {
                         'channel_map_count': len(channel_map) if isinstance(channel_map, dict) else 0,
-                        'latest_forward_timestamp': None
+                        'latest_forward_timestamp': (files.get('d2dlogs') or {}).get('latest_timestamp')
                     },
                     'filter_forwarder': {
-                        'latest_filter_timestamp': None,
-                        'link_types_seen': []
+                        'latest_filter_timestamp': (files.get('filteredlogs') or {}).get('latest_timestamp'),
+                        'link_types_seen': sorted((files.get('filteredlogs') or {}).get('link_types', {}).keys())
                     }
                 }
 
-                # Parse mention bot details from botlogs entries (use summary/content)
-                for entry in (botlogs[-200:]):
-                    text = str(entry.get('summary') or entry.get('content') or '')
-                    if not text:
-                        continue
-                    m = re.search(r'destination server:\s*(\d+)', text, re.IGNORECASE)
-                    if m:
-                        status['mention_bot']['destination_server_id'] = m.group(1)
-                        status['mention_bot']['detected'] = True
-                    m = re.search(r'Connected to server:\s*([^\n]+)', text, re.IGNORECASE)
-                    if m:
-                        status['mention_bot']['server_name'] = m.group(1).strip()
-                        status['mention_bot']['detected'] = True
-                    if 'Mention Bot Active' in text:
-                        status['mention_bot']['mode'] = 'Mention Bot Active'
-                        status['mention_bot']['detected'] = True
-                    m = re.search(r'WEBHOOK_ONLY\]\s*(True|False)', text)
-                    if m:
-                        status['mention_bot']['webhook_only'] = (m.group(1) == 'True')
-                        status['mention_bot']['detected'] = True
-                    m = re.search(r'PING_CHANNELS.*?\[(.*?)\]', text)
-                    if m:
-                        channels = [s.strip() for s in m.group(1).split(',') if s.strip()]
-                        status['mention_bot']['ping_channels'] = channels
-                        status['mention_bot']['detected'] = True
-
-                # Latest timestamps
-                def latest_ts(items):
-                    latest = None
-                    for it in items:
-                        ts = str(it.get('timestamp') or '')
-                        if ts and (latest is None or str(ts) > str(latest)):
-                            latest = ts
-                    return latest
-
-                status['d2d']['latest_forward_timestamp'] = latest_ts(d2dlogs)
-                status['filter_forwarder']['latest_filter_timestamp'] = latest_ts(filteredlogs)
-                # link types present
-                types = set()
-                for it in filteredlogs[-500:]:
-                    t = it.get('link_type')
-                    if t:
-                        types.add(str(t))
-                status['filter_forwarder']['link_types_seen'] = sorted(list(types))
-
                 payload = json.dumps({'success': True, 'status': status}, ensure_ascii=False).encode('utf-8')
-                self.send_response(200)
-                self.send_header('Content-Type', 'application/json; charset=utf-8')
-                self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate, max-age=0')
-                self.send_header('Content-Length', str(len(payload)))
-                self.end_headers()
-                self.wfile.write(payload)
+                self._send_json_payload(200, payload)
                 return
             except Exception as e:
                 payload = json.dumps({'success': False, 'error': str(e)}, ensure_ascii=False).encode('utf-8')
-                self.send_response(500)
-                self.send_header('Content-Type', 'application/json; charset=utf-8')
-                self.send_header('Content-Length', str(len(payload)))
-                self.end_headers()
-                self.wfile.write(payload)
+                self._send_json_payload(500, payload, no_store=False)
                 return
 
         else:
-            # Serve static files
-            super().do_GET()
+            # Serve static files (precompressed when the client accepts it)
+            if not self._send_static_compressed():
+                super().do_GET()
 
     def log_message(self, format, *args):
         """Suppress default logging"""
@@ -570,6 +1002,9 @@ def run_server(port=8080):
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
     
+    # Warm the /channels_meta cache so the first dashboard load is served from memory
+    CHANNELS_META.start_background_refresh()
+
     with socketserver.TCPServer(("", port), WorkingHTTPRequestHandler) as httpd:
         print(f"[HTTP] Serving on port {port}")
         try:
@@ -0,0 +1,121 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.web import http_server  # noqa: E402
+
+
+def test_ttl_cache_drops_expired_keys_and_idle_locks():
+    cache = http_server.TTLCache()
+    for i in range(50):
+        cache.get_or_compute(("channels", i), 0.01, lambda: i)
+    time.sleep(0.02)
+    assert cache.get_or_compute(("recent", 5), 10, lambda: "fresh") == ("fresh", False)
+    assert len(cache) == 1
+    assert cache._key_locks == {}
+
+
+def test_ttl_cache_single_flight():
+    cache = http_server.TTLCache()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", 10, slow)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == [1]
+    assert sorted(cached for _, cached in results) == [False] + [True] * 7
+    assert cache._key_locks == {}
+
+
+def _write_logs(tmp_path, log_type, entries):
+    import json
+    (tmp_path / f"{log_type}.json").write_text(json.dumps(entries), encoding="utf-8")
+
+
+def test_log_query_paginates_newest_first_and_filters(tmp_path):
+    _write_logs(tmp_path, "botlogs", [
+        {"timestamp": "2025-10-28 10:00:%02d" % i, "event": "heartbeat" if i % 2 else "error"} for i in range(7)
+    ])
+    _write_logs(tmp_path, "d2dlogs", [{"timestamp": "2025-10-29 09:00:00", "event": "webhook_forward", "success": True}])
+    index = http_server.LogQueryIndex(str(tmp_path))
+
+    page1 = index.query({}, page=1, page_size=3)
+    assert page1["total"] == 8 and page1["has_more"]
+    assert [e["timestamp"] for e in page1["logs"]] == [
+        "2025-10-29 09:00:00", "2025-10-28 10:00:06", "2025-10-28 10:00:05"]
+    page3 = index.query({}, page=3, page_size=3)
+    assert len(page3["logs"]) == 2 and not page3["has_more"]
+
+    errors = index.query({"event": ["error"]}, until="2025-10-28")
+    assert errors["total"] == 4
+    assert {e["log_type"] for e in errors["logs"]} == {"botlogs"}
+    assert index.query({"success": ["yes"], "log_type": ["d2dlogs"]})["total"] == 1
+    assert index.query({}, since="2025-10-29")["total"] == 1
+
+    # A changed log file is picked up on the next query
+    _write_logs(tmp_path, "d2dlogs", [])
+    assert index.query({}, page_size=50)["total"] == 7
+
+
+def test_negotiate_encoding():
+    assert http_server.negotiate_encoding("") is None
+    assert http_server.negotiate_encoding("gzip, deflate") == "gzip"
+    assert http_server.negotiate_encoding("gzip;q=0, identity") is None
+    assert http_server.negotiate_encoding("*") == ("br" if http_server.brotli else "gzip")
+    expected = "br" if http_server.brotli else "gzip"
+    assert http_server.negotiate_encoding("br, gzip;q=0.5") == expected
+
+
+def test_static_asset_cache_recompresses_after_a_change(tmp_path):
+    import gzip
+
+    asset = tmp_path / "app.js"
+    asset.write_text("console.log('one');" * 100, encoding="utf-8")
+    cache = http_server.StaticAssetCache()
+    body, _ = cache.get(str(asset), "gzip")
+    assert gzip.decompress(body) == asset.read_bytes()
+    assert cache.get(str(asset), "gzip")[0] is body
+
+    asset.write_text("console.log('two!');" * 100, encoding="utf-8")
+    body2, _ = cache.get(str(asset), "gzip")
+    assert gzip.decompress(body2) == asset.read_bytes()
+
+
+def test_channels_meta_single_flight_and_invalidate_during_build(monkeypatch):
+    service = http_server.ChannelsMetaService(ttl=300)
+    started = threading.Event()
+    release = threading.Event()
+    builds = []
+
+    def fake_build():
+        builds.append(len(builds))
+        if len(builds) == 1:
+            started.set()
+            release.wait(5)
+        return {"build": len(builds)}
+
+    monkeypatch.setattr(service, "_build", fake_build)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.get())) for _ in range(5)]
+    for t in threads:
+        t.start()
+    assert started.wait(5)
+    service.invalidate()   # the map changed while the first build was running
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(builds) == 2
+    assert results == [{"build": 2}] * 5
+    assert service.get() == {"build": 2}
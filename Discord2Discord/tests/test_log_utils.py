@@ -0,0 +1,76 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core import log_utils  # noqa: E402
+
+
+@pytest.fixture
+def logs_dir(tmp_path, monkeypatch):
+    for name in ("FILTERED_LOGS_PATH", "D2D_LOGS_PATH", "BOT_LOGS_PATH"):
+        monkeypatch.setattr(log_utils, name, str(tmp_path / os.path.basename(getattr(log_utils, name))))
+    monkeypatch.setattr(log_utils, "LOG_STATS_PATH", str(tmp_path / "log_stats.json"))
+    monkeypatch.setattr(log_utils, "LOG_LOCK_PATH", str(tmp_path / "log_stats.json.lock"))
+    monkeypatch.setattr(log_utils, "PULL_PREVIEWS_PATH", str(tmp_path / "pull_previews.json"))
+    return tmp_path
+
+
+def _stats(logs_dir):
+    return json.loads((logs_dir / "log_stats.json").read_text(encoding="utf-8"))
+
+
+def test_stats_follow_the_retained_window(logs_dir):
+    for i in range(5):
+        log_utils._write_to_log_file(log_utils.BOT_LOGS_PATH, {"event": "heartbeat", "summary": f"beat {i}"}, max_entries=3)
+    for i in range(2):
+        log_utils._write_to_log_file(log_utils.BOT_LOGS_PATH, {"event": "error", "summary": f"err {i}"}, max_entries=3)
+
+    bot = _stats(logs_dir)["files"]["botlogs"]
+    assert bot["count"] == 3
+    assert bot["events"] == {"heartbeat": 1, "error": 2}
+    assert bot["total_written"] == 7
+    assert not os.path.exists(log_utils.LOG_LOCK_PATH)
+
+
+def test_duplicate_entries_are_not_counted(logs_dir):
+    entry = {"event": "webhook_forward", "message_id": "1", "webhook_url": "x"}
+    log_utils.write_d2d_log(entry)
+    log_utils.write_d2d_log(entry)
+    d2d = _stats(logs_dir)["files"]["d2dlogs"]
+    assert d2d["count"] == 1 and d2d["total_written"] == 1
+
+
+def test_missing_sidecar_is_rebuilt_from_the_logs(logs_dir):
+    log_utils.write_filtered_log({"event": "filter_classify", "link_type": "AMAZON", "message_id": "1"})
+    log_utils.write_filtered_log({"event": "filter_classify", "link_type": "MAVELY", "message_id": "2"})
+    before = _stats(logs_dir)
+    os.remove(log_utils.LOG_STATS_PATH)
+
+    stats = log_utils.load_log_stats()
+    assert stats["files"]["filteredlogs"]["count"] == 2
+    assert stats["files"]["filteredlogs"]["link_types"] == {"AMAZON": 1, "MAVELY": 1}
+    assert stats["latest_timestamp"] == before["latest_timestamp"]
+    assert _stats(logs_dir) == stats
+
+
+def test_mention_bot_facts_come_only_from_status_entries(logs_dir):
+    log_utils.write_bot_log({"summary": "[SERVER] Connected to destination server: 999"})
+    log_utils.write_bot_log({"event": "message_detected", "message_id": "5",
+                             "content": "destination server: 111 [WEBHOOK_ONLY] True"})
+    mention = _stats(logs_dir)["mention_bot"]
+    assert mention["destination_server_id"] == "999"
+    assert mention["webhook_only"] is None
+    assert log_utils.rebuild_log_stats()["mention_bot"]["destination_server_id"] == "999"
+
+
+def test_pull_previews_stay_out_of_logs_and_stats(logs_dir):
+    log_utils.write_bot_log({"event": "heartbeat"})
+    written = log_utils.write_pull_previews({"10": [{"message_id": "a"}, {"message_id": "b"}]})
+    assert written == 2
+    log_utils.write_pull_previews({"10": [{"message_id": "c"}]})
+    assert [e["message_id"] for e in log_utils.read_pull_previews()] == ["c"]
+    assert _stats(logs_dir)["files"]["botlogs"]["count"] == 1
+    assert len(json.loads((logs_dir / "botlogs.json").read_text(encoding="utf-8"))) == 1
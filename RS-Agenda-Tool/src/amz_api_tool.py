@@ -1,6 +1,14 @@
-# ================= Amazon PA-API 5 Server (Clean, No-Cache) =================
+# ================= Amazon PA-API 5 Server (Clean, TTL-Cached) ===============
 import http.server, socketserver, json, os, time, hashlib
+import math
 import re
+import sqlite3
+import tempfile
+import threading
+import functools
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from urllib.parse import urlparse, parse_qs, unquote
 import requests
 from datetime import datetime, timezone
@@ -56,6 +64,44 @@ PAAPI_MAX_RETRIES = int(_env("PAAPI_MAX_RETRIES", "3"))
 PAAPI_ENDPOINT = f"https://{PAAPI_HOST}/paapi5"
 HTTP_TIMEOUT = PAAPI_TIMEOUT_MS / 1000.0
 
+# Response cache: every request includes offers (prices/availability), so one short TTL covers all entries
+PAAPI_CACHE_TTL        = int(_env("PAAPI_CACHE_TTL", "120"))
+PAAPI_CACHE_MAX        = int(_env("PAAPI_CACHE_MAX", "2000"))
+PAAPI_CACHE_FILE       = _env("PAAPI_CACHE_FILE", "")   # optional JSON file; empty = memory only
+
+# GetItems batching: concurrent lookups within this window share one call (max 10 ASINs each)
+PAAPI_BATCH_WINDOW_MS = int(_env("PAAPI_BATCH_WINDOW_MS", "40"))
+PAAPI_BATCH_SIZE = 10
+PAAPI_LIST_MAX = 100
+# SearchItems: PA-API serves at most 10 pages; the next page is prefetched while quota allows
+PAAPI_SEARCH_MAX_PAGES = 10
+SEARCH_PREFETCH = _env("SEARCH_PREFETCH", "1").strip().lower() not in ("0", "false", "no", "off")
+SEARCH_PREFETCH_WAIT_SEC = 3.0   # how long a prefetch waits for idle throttle capacity before giving up
+
+# Client-side throttle matching the account's PA-API quotas (shared by all handler threads)
+PAAPI_TPS = float(_env("PAAPI_TPS", "1"))
+PAAPI_TPD = int(_env("PAAPI_TPD", "8640"))
+PAAPI_THROTTLE_WAIT_MS = int(_env("PAAPI_THROTTLE_WAIT_MS", "10000"))  # 0 = fail fast instead of queueing
+
+# Short-link (amzn.to, bit.ly, ...) -> ASIN mappings, persisted so a link is only resolved once
+LINK_CACHE_FILE = _env("LINK_CACHE_FILE", "link_cache.json")
+LINK_CACHE_MAX = 5000
+LINK_MAX_REDIRECTS = 10
+
+# Price watcher: tracked ASINs are refreshed on an interval and changes reported
+WATCH_FILE         = _env("WATCH_FILE", "watchlist.json")
+WATCH_INTERVAL_SEC = int(_env("WATCH_INTERVAL_SEC", "900"))
+WATCH_WEBHOOK_URL  = _env("WATCH_WEBHOOK_URL", "")        # Discord-style webhook (optional)
+WATCH_LOG_FILE     = _env("WATCH_LOG_FILE", "price_events.log")
+WATCH_DAY_RESERVE  = int(_env("WATCH_DAY_RESERVE", "500"))  # daily calls left for on-demand lookups
+WATCH_CHUNK_WAIT_SEC = 30.0   # per GetItems chunk: how long a cycle waits for idle throttle capacity
+HISTORY_DB         = _env("HISTORY_DB", "price_history.db")
+HISTORY_RAW_DAYS   = int(_env("HISTORY_RAW_DAYS", "7"))   # older samples are downsampled to hourly rollups
+HISTORY_MAX_DAYS   = 365
+
+# HTTP worker threads; a slow PA-API call or redirect no longer blocks other requests
+PAAPI_HTTP_WORKERS = int(_env("PAAPI_HTTP_WORKERS", "8"))
+
 print(
     f"[paapi] loaded from: {PAAPI_SRC}  "
     f"tag={bool(PAAPI_PARTNER_TAG)} key={bool(PAAPI_ACCESS_KEY)} secret={bool(PAAPI_SECRET_KEY)}"
@@ -76,6 +122,11 @@ def _get_signature_key(key: str, date_stamp: str, region_name: str, service_name
     k_signing = _hmac.new(k_service, b"aws4_request", hashlib.sha256).digest()
     return k_signing
 
+@functools.lru_cache(maxsize=8)
+def _cached_signing_key(secret: str, date_stamp: str, region_name: str, service_name: str) -> bytes:
+    """The derived key only changes daily, so derive it once per (date, region, service)."""
+    return _get_signature_key(secret, date_stamp, region_name, service_name)
+
 def sigv4_headers(host: str, region: str, service: str, target: str, payload_bytes: bytes) -> dict:
     """
     Build canonical SigV4 headers for PA-API v5.
@@ -127,7 +178,7 @@ def sigv4_headers(host: str, region: str, service: str, target: str, payload_byt
         hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()
     ])
 
-    signing_key = _get_signature_key(PAAPI_SECRET_KEY, date_stamp, region, service)
+    signing_key = _cached_signing_key(PAAPI_SECRET_KEY, date_stamp, region, service)
     signature = _hmac.new(signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
 
     headers = {
@@ -152,6 +203,197 @@ def sigv4_headers(host: str, region: str, service: str, target: str, payload_byt
 # ============================================================================
 
 
+# ================= Response Cache ===========================================
+def _write_json_atomic(path: str, data):
+    """Write JSON via a unique temp file in the same folder, then os.replace it into place."""
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+class ResponseCache:
+    """
+    Size-bounded LRU of PA-API results with per-entry expiry (wall clock, so
+    entries survive a restart when persisted). Thread-safe; writes to the
+    optional cache file are debounced.
+    """
+    SAVE_DELAY_SEC = 5.0
+
+    def __init__(self, max_entries: int, path: str = ""):
+        self.max_entries = max(1, max_entries)
+        self.path = path
+        self.entries = OrderedDict()   # key -> (expires_at, value)
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()   # one writer at a time, snapshots written in order
+        self.hits = 0
+        self.misses = 0
+        self._save_timer = None
+        if self.path:
+            self.load()
+
+    def get(self, key: str):
+        now = time.time()
+        with self.lock:
+            hit = self.entries.get(key)
+            if hit is None or hit[0] <= now:
+                if hit is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return hit[1]
+
+    def put(self, key: str, value, ttl: float):
+        if ttl <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (time.time() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self._schedule_save()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                    "persisted": bool(self.path)}
+
+    def _schedule_save(self):
+        """Caller must hold the lock."""
+        if not self.path or self._save_timer is not None:
+            return
+        self._save_timer = threading.Timer(self.SAVE_DELAY_SEC, self.save)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def save(self):
+        with self.save_lock:
+            with self.lock:
+                self._save_timer = None
+                now = time.time()
+                snapshot = [[k, exp, v] for k, (exp, v) in self.entries.items() if exp > now]
+            try:
+                _write_json_atomic(self.path, snapshot)
+            except Exception as e:
+                print("[cache] save failed:", e)
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                rows = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print("[cache] load failed:", e)
+            return
+        now = time.time()
+        with self.lock:
+            for k, exp, v in rows[-self.max_entries:]:
+                if exp > now:
+                    self.entries[k] = (exp, v)
+        print(f"[cache] restored {len(self.entries)} entries from {self.path}")
+
+PAAPI_CACHE = ResponseCache(PAAPI_CACHE_MAX, PAAPI_CACHE_FILE)
+
+def _cache_key(target: str, body: dict) -> str:
+    """Stable key for a request body: lists are order-insensitive, whitespace-free JSON."""
+    norm = {k: (sorted(str(x) for x in v) if isinstance(v, list) else v) for k, v in body.items()}
+    digest = hashlib.sha1(json.dumps(norm, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+    return f"{target}:{digest}"
+# ============================================================================
+
+
+# ================= Throttle =================================================
+class _Bucket:
+    """Token bucket whose balance may go negative: a deficit is a queue of reservations."""
+    def __init__(self, rate: float, capacity: float):
+        self.rate = max(rate, 1e-9)
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def wait_for_one(self) -> float:
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+class PaapiThrottle:
+    """
+    Paces PA-API calls to PAAPI_TPS per second and PAAPI_TPD per day. acquire()
+    reserves a slot and sleeps until it comes up, so callers are served in
+    arrival order; if the wait would exceed max_wait it returns False instead.
+    """
+    def __init__(self, tps: float, tpd: int, max_wait: float):
+        self.tps = tps
+        self.tpd = tpd
+        self.second = _Bucket(tps, max(1.0, tps))
+        self.day = _Bucket(tpd / 86400.0, tpd)
+        self.max_wait = max(0.0, max_wait)
+        self.lock = threading.Lock()
+        self.granted = 0
+        self.rejected = 0
+
+    def acquire(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.second.refill(now)
+            self.day.refill(now)
+            wait = max(self.second.wait_for_one(), self.day.wait_for_one())
+            if wait > self.max_wait:
+                self.rejected += 1
+                return False
+            self.second.tokens -= 1
+            self.day.tokens -= 1
+            self.granted += 1
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def has_headroom(self, day_reserve: int = 0) -> bool:
+        """True if a call could go out now without queueing or touching day_reserve (for optional work)."""
+        with self.lock:
+            now = time.monotonic()
+            self.second.refill(now)
+            self.day.refill(now)
+            return self.second.tokens >= 1.0 and self.day.tokens >= 1.0 + day_reserve
+
+    def wait_for_headroom(self, day_reserve: int = 0, timeout: float = 0.0) -> bool:
+        """Poll has_headroom() for up to timeout seconds."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        while not self.has_headroom(day_reserve):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def penalize(self):
+        """Amazon throttled us anyway: empty the per-second bucket so queued calls back off."""
+        with self.lock:
+            self.second.refill(time.monotonic())
+            self.second.tokens = min(self.second.tokens, 0.0)
+
+    def stats(self) -> dict:
+        with self.lock:
+            now = time.monotonic()
+            self.day.refill(now)
+            return {"tps": self.tps, "tpd": self.tpd, "granted": self.granted,
+                    "rejected": self.rejected, "day_remaining": int(max(0.0, self.day.tokens))}
+
+PAAPI_THROTTLE = PaapiThrottle(PAAPI_TPS, PAAPI_TPD, PAAPI_THROTTLE_WAIT_MS / 1000.0)
+# ============================================================================
+
+
 # ================= Mapping Helpers ==========================================
 def _money_display(amount_obj):
     if not amount_obj:
@@ -354,7 +596,7 @@ def _map_error_to_status(raw_err: dict):
             http_status = int(code_str.split("_", 1)[1])
         except Exception:
             http_status = 400
-    elif code_str in ("THROTTLING", "TOO_MANY_REQUESTS"):
+    elif code_str in ("THROTTLING", "TOO_MANY_REQUESTS", "CLIENT_THROTTLED"):
         http_status = 429
     elif code_str in ("ACCESS_DENIED", "UNAUTHORIZED", "INVALID_SIGNATURE"):
         http_status = 403
@@ -409,20 +651,17 @@ def _full_resources_searchitems():
         "ParentASIN",
     ]
 
-def handle_get_items(asin: str, fmt: str = "card"):
-    asin = (asin or "").strip().upper()
-    if len(asin) != 10:
-        return 400, {"error": {"code": "ASIN_INVALID", "message": "Provide a valid 10-char ASIN"}}
-
-    body = {
-        "ItemIds": [asin],
+def _get_items_body(asins):
+    return {
+        "ItemIds": list(asins),
         "PartnerTag": PAAPI_PARTNER_TAG,
         "PartnerType": "Associates",
         "Marketplace": PAAPI_MARKETPLACE,
         "Resources": _full_resources_getitems(),
     }
 
-    raw = paapi_post("GetItems", body)
+def _get_items_result(raw: dict, fmt: str = "card"):
+    """Map a single-ASIN GetItems response to (status, payload)."""
     if "error" in raw:
         status, code_str = _map_error_to_status(raw["error"])
         msg = raw["error"].get("message") or "Unknown error"
@@ -444,8 +683,40 @@ def handle_get_items(asin: str, fmt: str = "card"):
         return 200, {"text": map_get_items_to_text(item)}
     return 200, map_get_items_to_card(item)
 
+def handle_get_items(asin: str, fmt: str = "card", fresh: bool = False):
+    asin = (asin or "").strip().upper()
+    if len(asin) != 10:
+        return 400, {"error": {"code": "ASIN_INVALID", "message": "Provide a valid 10-char ASIN"}}
+
+    raw = fetch_items([asin], fresh=fresh)[asin]
+    return _get_items_result(raw, fmt)
+
+def handle_get_items_many(asins, fmt: str = "card", fresh: bool = False):
+    """
+    Look up a list of ASINs in as few GetItems calls as possible. Results come
+    back in request order; duplicates are looked up once.
+    """
+    if not isinstance(asins, list) or not asins:
+        return 400, {"error": {"code": "BAD_REQUEST", "message": "Provide a non-empty list of ASINs"}}
+    if len(asins) > PAAPI_LIST_MAX:
+        return 400, {"error": {"code": "BAD_REQUEST", "message": f"At most {PAAPI_LIST_MAX} ASINs per request"}}
+
+    norm = [str(a or "").strip().upper() for a in asins]
+    valid = [a for a in dict.fromkeys(norm) if len(a) == 10]
+    raws = fetch_items(valid, fresh=fresh) if valid else {}
+
+    results = []
+    for asin in norm:
+        if asin not in raws:
+            results.append({"asin": asin, "status": 400,
+                            "error": {"code": "ASIN_INVALID", "message": "Provide a valid 10-char ASIN"}})
+            continue
+        status, payload = _get_items_result(raws[asin], fmt)
+        results.append({"asin": asin, "status": status, **payload})
+    return 200, {"results": results}
+
 def handle_search_items(payload: dict):
-    keywords     = (payload.get("keywords") or "").strip()
+    keywords     = " ".join((payload.get("keywords") or "").split())
     search_index = (payload.get("searchIndex") or "All").strip()
     brand        = (payload.get("brand") or "").strip()
     min_price    = payload.get("minPrice")
@@ -456,6 +727,8 @@ def handle_search_items(payload: dict):
 
     if not keywords:
         return 400, {"error": {"code": "BAD_REQUEST", "message": "Missing keywords"}}
+    if not 1 <= page <= PAAPI_SEARCH_MAX_PAGES:
+        return 400, {"error": {"code": "BAD_REQUEST", "message": f"page must be 1-{PAAPI_SEARCH_MAX_PAGES}"}}
 
     resources = _full_resources_searchitems()
     if external_id and "ItemInfo.ExternalIds" not in resources:
@@ -481,7 +754,10 @@ def handle_search_items(payload: dict):
     if browse_node:
         req["BrowseNodeId"] = browse_node
 
-    raw = paapi_post("SearchItems", req)
+    fresh = bool(payload.get("fresh"))
+    if not fresh:
+        _await_search_prefetch(req)
+    raw = paapi_cached("SearchItems", req, fresh=fresh)
     if "error" in raw:
         status, code_str = _map_error_to_status(raw["error"])
         msg = raw["error"].get("message") or "Unknown error"
@@ -505,8 +781,53 @@ def handle_search_items(payload: dict):
             return False
         items = [it for it in items if match_external(it)]
 
-    mapped = map_search_to_list(items, refinements=refinements, page=page, total_pages=None)
+    total_pages = None
+    if search_result.get("TotalResultCount") is not None:
+        total_pages = min(PAAPI_SEARCH_MAX_PAGES, -(-int(search_result["TotalResultCount"]) // 10))
+        if total_pages > page:
+            _prefetch_search_page(dict(req, ItemPage=page + 1))
+
+    mapped = map_search_to_list(items, refinements=refinements, page=page, total_pages=total_pages)
     return 200, mapped
+
+SEARCH_PREFETCH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="search-prefetch")
+_SEARCH_PREFETCHING = {}   # cache key -> Future of an in-flight prefetch
+_SEARCH_PREFETCH_LOCK = threading.Lock()
+
+def _prefetch_search_page(req: dict):
+    """
+    Warm PAAPI_CACHE with the next result page. The page that triggered this
+    usually just spent the only per-second token, so the background task waits
+    up to SEARCH_PREFETCH_WAIT_SEC for idle capacity before giving up.
+    """
+    if not SEARCH_PREFETCH:
+        return
+    key = _cache_key("SearchItems", req)
+
+    def _run():
+        try:
+            if PAAPI_THROTTLE.wait_for_headroom(WATCH_DAY_RESERVE, SEARCH_PREFETCH_WAIT_SEC):
+                paapi_cached("SearchItems", req)
+        except Exception as e:
+            print("[search] prefetch failed:", e)
+        finally:
+            with _SEARCH_PREFETCH_LOCK:
+                _SEARCH_PREFETCHING.pop(key, None)
+
+    with _SEARCH_PREFETCH_LOCK:
+        if key in _SEARCH_PREFETCHING or PAAPI_CACHE.get(key) is not None:
+            return
+        _SEARCH_PREFETCHING[key] = SEARCH_PREFETCH_POOL.submit(_run)
+
+def _await_search_prefetch(req: dict):
+    """If this page is being prefetched, wait for it rather than sending the same call twice."""
+    with _SEARCH_PREFETCH_LOCK:
+        fut = _SEARCH_PREFETCHING.get(_cache_key("SearchItems", req))
+    if fut is not None:
+        try:
+            fut.result(timeout=HTTP_TIMEOUT * max(PAAPI_MAX_RETRIES, 3))
+        except Exception:
+            pass
 # ============================================================================
 
 
@@ -536,8 +857,18 @@ class Handler(http.server.SimpleHTTPRequestHandler):
                 "have_tag": bool(PAAPI_PARTNER_TAG),
                 "have_key": bool(PAAPI_ACCESS_KEY),
                 "have_secret": bool(PAAPI_SECRET_KEY),
-                "env_src": PAAPI_SRC
+                "env_src": PAAPI_SRC,
+                "cache": PAAPI_CACHE.stats(),
+                "throttle": PAAPI_THROTTLE.stats(),
             }).encode("utf-8"))
+        elif path in ("/history", "/history/series"):
+            code, payload = handle_history(parse_qs(self.path.split("?", 1)[1] if "?" in self.path else ""),
+                                           series=path.endswith("series"))
+            self._set_headers(code)
+            self.wfile.write(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        elif path == "/watch":
+            self._set_headers(200)
+            self.wfile.write(json.dumps(PRICE_WATCHER.list(), ensure_ascii=False).encode("utf-8"))
         else:
             self._set_headers(404)
             self.wfile.write(b'{"error":"Not found"}')
@@ -552,9 +883,15 @@ class Handler(http.server.SimpleHTTPRequestHandler):
             data = {}
 
         if path == "/paapi/get-items":
-            asin = (data.get("asin") or "").strip().upper()
             fmt  = (data.get("format") or "card").strip()
-            code, payload = handle_get_items(asin, fmt)
+            asins = data.get("asins")
+            if asins is None and isinstance(data.get("asin"), list):
+                asins = data.get("asin")
+            if asins is not None:
+                code, payload = handle_get_items_many(asins, fmt, fresh=bool(data.get("fresh")))
+            else:
+                asin = (data.get("asin") or "").strip().upper()
+                code, payload = handle_get_items(asin, fmt, fresh=bool(data.get("fresh")))
             self._set_headers(code)
             self.wfile.write(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
             return
@@ -569,7 +906,24 @@ class Handler(http.server.SimpleHTTPRequestHandler):
         if path in ("/price", "/paapi/price"):
             link = (data.get("link") or data.get("url") or data.get("href") or "").strip()
             fmt  = (data.get("format") or "card").strip()
-            code, payload = handle_price_link(link, fmt)
+            code, payload = handle_price_link(link, fmt, fresh=bool(data.get("fresh")))
+            self._set_headers(code)
+            self.wfile.write(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+            return
+
+        if path in ("/watch/add", "/watch/remove"):
+            code, payload = handle_watch_update(data or {}, remove=path.endswith("remove"))
+            self._set_headers(code)
+            self.wfile.write(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+            return
+
+        # Bulk: {"links": [...]} or {"text": "<pasted deal sheet>"}
+        if path in ("/price/bulk", "/paapi/price-bulk"):
+            links = data.get("links")
+            if links is None:
+                links = data.get("text") or ""
+            fmt  = (data.get("format") or "card").strip()
+            code, payload = handle_price_links(links, fmt, fresh=bool(data.get("fresh")))
             self._set_headers(code)
             self.wfile.write(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
             return
@@ -579,6 +933,10 @@ class Handler(http.server.SimpleHTTPRequestHandler):
 # ============================================================================
 
 
+# Keep-alive connections to PAAPI_HOST, shared by all handler threads
+PAAPI_SESSION = requests.Session()
+PAAPI_SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(1, PAAPI_HTTP_WORKERS)))
+
 # ================= PATCH: Canonical Signing Fix for Windows =================
 def paapi_post(target: str, body_dict: dict) -> dict:
     """
@@ -600,10 +958,14 @@ def paapi_post(target: str, body_dict: dict) -> dict:
 
     while True:
         tries += 1
+        if not PAAPI_THROTTLE.acquire():
+            return {"error": {"code": "CLIENT_THROTTLED", "message": "Local PA-API rate limit reached (PAAPI_TPS/PAAPI_TPD)"}}
         try:
-            r = requests.post(url, data=payload, headers=headers, timeout=HTTP_TIMEOUT)
+            r = PAAPI_SESSION.post(url, data=payload, headers=headers, timeout=HTTP_TIMEOUT)
             print("[paapi]", r.status_code, "| reqid", r.headers.get("x-amzn-RequestId"), "|", target)
 
+            if r.status_code == 429:
+                PAAPI_THROTTLE.penalize()
             if r.status_code in (429,) or 500 <= r.status_code < 600:
                 if tries < max_tries:
                     time.sleep((0.5 * tries))
@@ -629,6 +991,155 @@ def paapi_post(target: str, body_dict: dict) -> dict:
 # ================= END PATCH =================================================
 
 
+# ================= Cached PA-API Calls ======================================
+def paapi_cached(target: str, body_dict: dict, fresh: bool = False) -> dict:
+    """
+    paapi_post() behind PAAPI_CACHE. GetItems is cached per ASIN so any mix of
+    hot and cold ASINs only sends the cold ones; SearchItems is cached per
+    normalized request. Errors are never cached; fresh=True skips lookups.
+    """
+    ttl = PAAPI_CACHE_TTL
+    if target != "GetItems":
+        key = _cache_key(target, body_dict)
+        if not fresh:
+            hit = PAAPI_CACHE.get(key)
+            if hit is not None:
+                return hit
+        raw = paapi_post(target, body_dict)
+        if "error" not in raw and not raw.get("Errors"):
+            PAAPI_CACHE.put(key, raw, ttl)
+        return raw
+
+    base = {k: v for k, v in body_dict.items() if k != "ItemIds"}
+    asins = [str(a).upper() for a in body_dict.get("ItemIds") or []]
+    keys = {a: _cache_key(target, dict(base, ItemIds=[a])) for a in asins}
+    found = {}
+    if not fresh:
+        for a in asins:
+            hit = PAAPI_CACHE.get(keys[a])
+            if hit is not None:
+                found[a] = hit
+    missing = [a for a in asins if a not in found]
+    errors = []
+    if missing:
+        raw = paapi_post(target, dict(base, ItemIds=missing))
+        if "error" in raw:
+            if not found:
+                return raw
+            errors = [{"Code": raw["error"].get("code"), "Message": raw["error"].get("message")}]
+        else:
+            fetched = []
+            for item in (raw.get("ItemsResult") or {}).get("Items") or []:
+                a = str(item.get("ASIN") or "").upper()
+                if a in keys:
+                    found[a] = item
+                    PAAPI_CACHE.put(keys[a], item, ttl)
+                    fetched.append((a, _price_snapshot(item)))
+            errors = raw.get("Errors") or []
+            try:
+                PRICE_HISTORY.record_many(fetched)
+            except Exception as e:
+                print("[history] record failed:", e)
+
+    merged = {}
+    items = [found[a] for a in asins if a in found]
+    if items:
+        merged["ItemsResult"] = {"Items": items}
+    if errors:
+        merged["Errors"] = errors
+    return merged
+
+
+class GetItemsBatcher:
+    """
+    Coalesces GetItems lookups from concurrent handler threads. ASINs
+    submitted within the batch window are sent together, up to 10 per call,
+    and a lookup already waiting for an ASIN is shared rather than repeated.
+    Each future resolves to a single-ASIN GetItems-shaped response.
+    """
+    def __init__(self, window_sec: float, batch_size: int = PAAPI_BATCH_SIZE):
+        self.window_sec = max(0.0, window_sec)
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.pending = OrderedDict()   # asin -> Future
+        self.timer = None
+
+    def submit(self, asin: str) -> concurrent.futures.Future:
+        flush_now = False
+        with self.lock:
+            fut = self.pending.get(asin)
+            if fut is not None:
+                return fut
+            fut = concurrent.futures.Future()
+            self.pending[asin] = fut
+            if len(self.pending) >= self.batch_size:
+                flush_now = True
+            elif self.timer is None:
+                self.timer = threading.Timer(self.window_sec, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+        if flush_now:
+            threading.Thread(target=self.flush, name="paapi-batch", daemon=True).start()
+        return fut
+
+    def flush(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            batch, self.pending = self.pending, OrderedDict()
+        asins = list(batch)
+        for i in range(0, len(asins), self.batch_size):
+            chunk = asins[i:i + self.batch_size]
+            try:
+                raw = paapi_cached("GetItems", _get_items_body(chunk))
+            except Exception as e:
+                raw = {"error": {"code": "INTERNAL_ERROR", "message": str(e)[:200]}}
+            for asin, result in _split_get_items(raw, chunk).items():
+                batch[asin].set_result(result)
+
+def _split_get_items(raw: dict, asins) -> dict:
+    """Fan a multi-ASIN GetItems response out to single-ASIN responses."""
+    if "error" in raw:
+        return {a: raw for a in asins}
+    by_asin = {str(it.get("ASIN") or "").upper(): it for it in (raw.get("ItemsResult") or {}).get("Items") or []}
+    errors = raw.get("Errors") or []
+    out = {}
+    for a in asins:
+        if a in by_asin:
+            out[a] = {"ItemsResult": {"Items": [by_asin[a]]}}
+        else:
+            errs = [e for e in errors if a in str(e.get("Message") or "")]
+            out[a] = {"Errors": errs} if errs else {}
+    return out
+
+GET_ITEMS_BATCHER = GetItemsBatcher(PAAPI_BATCH_WINDOW_MS / 1000.0)
+
+def fetch_items(asins, fresh: bool = False) -> dict:
+    """
+    Single-ASIN GetItems responses for each ASIN. Cached ASINs return
+    immediately; the rest go through GET_ITEMS_BATCHER (or straight to
+    PA-API in batches of 10 when fresh=True).
+    """
+    out = {}
+    if fresh:
+        for i in range(0, len(asins), PAAPI_BATCH_SIZE):
+            chunk = list(asins[i:i + PAAPI_BATCH_SIZE])
+            out.update(_split_get_items(paapi_cached("GetItems", _get_items_body(chunk), fresh=True), chunk))
+        return out
+    futures = {}
+    for a in asins:
+        hit = PAAPI_CACHE.get(_cache_key("GetItems", _get_items_body([a])))
+        if hit is not None:
+            out[a] = {"ItemsResult": {"Items": [hit]}}
+        else:
+            futures[a] = GET_ITEMS_BATCHER.submit(a)
+    for a, fut in futures.items():
+        out[a] = fut.result()
+    return out
+# ============================================================================
+
+
 # ================= Helpers: Link → ASIN =====================================
 _ASIN_RE_PATH = re.compile(r"/(?:dp|gp/product|gp/aw/d|gp/offer-listing|exec/obidos/ASIN|o/ASIN|ASIN|product)/([A-Z0-9]{10})(?:[/?#]|$)", re.IGNORECASE)
 _ASIN_RE_QUERY = re.compile(r"[?&](?:ASIN|asin)=([A-Z0-9]{10})(?:[&#]|$)")
@@ -659,38 +1170,563 @@ def _extract_asin_from_url(url: str):
         return m.group(2).upper()
     return None
 
+_RESOLVE_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; paapi-tool/1.0)"}
+
+def _is_amazon_product_url(url: str) -> bool:
+    try:
+        u = urlparse(url)
+    except Exception:
+        return False
+    if "amazon." not in (u.netloc or "").lower():
+        return False
+    return bool(_ASIN_RE_PATH.search(unquote(u.path or "")) or _ASIN_RE_QUERY.search("?" + (u.query or "")))
+
 def _resolve_final_url(url: str) -> str:
+    """
+    Follow redirects without downloading pages: HEAD each hop and stop as soon
+    as the URL carries an ASIN. Falls back to a streamed GET (body never read)
+    for shorteners that reject HEAD.
+    """
     if not url:
         return ""
+    cur = url
     try:
-        # Some shorteners require GET to follow redirects reliably
-        r = requests.get(url, allow_redirects=True, timeout=HTTP_TIMEOUT, headers={
-            "User-Agent": "Mozilla/5.0 (compatible; paapi-tool/1.0)"
-        })
-        return r.url or url
+        for _ in range(LINK_MAX_REDIRECTS):
+            if _is_amazon_product_url(cur):
+                return cur
+            r = requests.head(cur, allow_redirects=False, timeout=HTTP_TIMEOUT, headers=_RESOLVE_HEADERS)
+            if r.status_code in (405, 403, 400, 501):
+                break
+            loc = r.headers.get("Location")
+            if not r.is_redirect or not loc:
+                return cur
+            cur = requests.compat.urljoin(cur, loc)
+        with requests.get(cur, allow_redirects=True, stream=True, timeout=HTTP_TIMEOUT, headers=_RESOLVE_HEADERS) as r:
+            return r.url or cur
     except Exception:
-        return url
+        return cur
 
-def handle_price_link(link: str, fmt: str = "card"):
-    link = (link or "").strip()
-    if not link:
-        return 400, {"error": {"code": "BAD_REQUEST", "message": "Missing link"}}
+class LinkResolver:
+    """
+    Short-link -> ASIN lookups with a persistent cache. Concurrent requests for
+    the same link wait on a single resolution. Writes to the cache file are
+    debounced; flush() writes pending changes right away.
+    """
+    SAVE_DELAY_SEC = 5.0
+
+    def __init__(self, path: str, max_entries: int = LINK_CACHE_MAX):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.map = OrderedDict()      # link -> asin
+        self.inflight = {}            # link -> Future
+        self._dirty = False
+        self._save_timer = None
+        self._load()
+
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                obj = json.load(f)
+            if isinstance(obj, dict):
+                self.map.update(obj)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print("[links] load failed:", e)
+
+    def _schedule_save(self):
+        """Caller must hold the lock."""
+        self._dirty = True
+        if not self.path or self._save_timer is not None:
+            return
+        self._save_timer = threading.Timer(self.SAVE_DELAY_SEC, self.flush)
+        self._save_timer.daemon = True
+        self._save_timer.start()
 
+    def flush(self):
+        """Write the map now if it changed since the last save."""
+        if not self.path:
+            return
+        with self.save_lock:
+            with self.lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                snapshot = dict(self.map)
+            try:
+                _write_json_atomic(self.path, snapshot)
+            except Exception as e:
+                print("[links] save failed:", e)
+                with self.lock:
+                    self._schedule_save()
+
+    def resolve(self, link: str):
+        """ASIN for a short link, or None if it does not lead to an Amazon product."""
+        owner = False
+        with self.lock:
+            asin = self.map.get(link)
+            if asin:
+                self.map.move_to_end(link)
+                return asin
+            fut = self.inflight.get(link)
+            if fut is None:
+                fut = concurrent.futures.Future()
+                self.inflight[link] = fut
+                owner = True
+        if not owner:
+            return fut.result()
+
+        asin = None
+        try:
+            asin = _extract_asin_from_url(_resolve_final_url(link))
+        finally:
+            with self.lock:
+                self.inflight.pop(link, None)
+                if asin:
+                    self.map[link] = asin
+                    while len(self.map) > self.max_entries:
+                        self.map.popitem(last=False)
+                    self._schedule_save()
+            fut.set_result(asin)
+        return asin
+
+LINK_RESOLVER = LinkResolver(LINK_CACHE_FILE)
+
+RESOLVE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="link-resolve")
+
+def _link_to_asin(link: str):
+    """ASIN from a bare ASIN, an Amazon URL, or (via LINK_RESOLVER) a short link."""
     # If user pasted a bare ASIN, accept it directly
     if re.fullmatch(r"[A-Za-z0-9]{10}", link):
-        asin = link.upper()
-        return handle_get_items(asin, fmt)
-
+        return link.upper()
     # Try direct extraction first
     asin = _extract_asin_from_url(link)
     if not asin:
-        # Follow redirects (amzn.to, bit.ly, etc.)
-        final = _resolve_final_url(link)
-        asin = _extract_asin_from_url(final)
+        # Follow redirects (amzn.to, bit.ly, etc.); cached per link
+        asin = LINK_RESOLVER.resolve(link)
+    return asin
+
+def handle_price_link(link: str, fmt: str = "card", fresh: bool = False):
+    link = (link or "").strip()
+    if not link:
+        return 400, {"error": {"code": "BAD_REQUEST", "message": "Missing link"}}
+
+    asin = _link_to_asin(link)
     if not asin:
         return 400, {"error": {"code": "ASIN_NOT_FOUND", "message": "Could not extract ASIN from link"}}
 
-    return handle_get_items(asin, fmt)
+    return handle_get_items(asin, fmt, fresh=fresh)
+
+# Pasted text: only URLs and ASIN-shaped tokens count; ordinary words are ignored
+_TEXT_LINK_RE = re.compile(r"https?://[^\s<>\"']+|\b(?:B0[A-Z0-9]{8}|\d{9}[\dX])\b")
+
+def _links_from_text(text: str):
+    return [m.group(0).rstrip(").,;:!?]}>") for m in _TEXT_LINK_RE.finditer(text or "")]
+
+def handle_price_links(links, fmt: str = "card", fresh: bool = False):
+    """
+    Price a pasted deal sheet: links/ASINs are mapped to ASINs locally where
+    possible, short links are resolved concurrently, and the distinct ASINs go
+    through batched GetItems. Results are returned in input order.
+    """
+    if isinstance(links, str):
+        links = _links_from_text(links)
+    links = [str(l or "").strip() for l in (links or []) if str(l or "").strip()]
+    if not links:
+        return 400, {"error": {"code": "BAD_REQUEST", "message": "Provide links (list) or text"}}
+    if len(links) > PAAPI_LIST_MAX:
+        return 400, {"error": {"code": "BAD_REQUEST", "message": f"At most {PAAPI_LIST_MAX} links per request"}}
+
+    distinct = list(dict.fromkeys(links))
+    asin_by_link = dict(zip(distinct, RESOLVE_POOL.map(_link_to_asin, distinct)))
+    LINK_RESOLVER.flush()   # one cache write for the whole paste
+    asins = list(dict.fromkeys(a for a in asin_by_link.values() if a))
+    raws = fetch_items(asins, fresh=fresh) if asins else {}
+
+    results = []
+    for link in links:
+        asin = asin_by_link.get(link)
+        if not asin:
+            results.append({"link": link, "status": 400,
+                            "error": {"code": "ASIN_NOT_FOUND", "message": "Could not extract ASIN from link"}})
+            continue
+        status, payload = _get_items_result(raws[asin], fmt)
+        results.append({"link": link, "asin": asin, "status": status, **payload})
+    return 200, {"results": results, "asins": len(asins)}
+# ============================================================================
+
+
+# ================= Price History & Watcher ==================================
+def _cents(money):
+    try:
+        return int(round(float((money or {}).get("Amount")) * 100))
+    except Exception:
+        return None
+
+def _price_snapshot(item: dict) -> dict:
+    """The fields the watcher compares between polls."""
+    listing = _first((item.get("Offers") or {}).get("Listings")) or {}
+    price = listing.get("Price") or {}
+    delivery = listing.get("DeliveryInfo") or {}
+    return {
+        "price": _cents(price),
+        "list_price": _cents(price.get("SavingsBasis")),
+        "availability": (listing.get("Availability") or {}).get("Message"),
+        "buybox": bool(listing.get("IsBuyBoxWinner")),
+        "amazon_fulfilled": bool(delivery.get("IsAmazonFulfilled")),
+    }
+
+class PriceHistory:
+    """
+    Per-ASIN price samples in SQLite (prices as integer cents). Samples older
+    than HISTORY_RAW_DAYS are folded into hourly min/max/sum/count rollups,
+    so window queries stay exact for min/max/avg while the file stays small.
+    """
+    BUCKET_SEC = 3600
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS samples ("
+            " asin TEXT NOT NULL, ts INTEGER NOT NULL, price INTEGER, list_price INTEGER, availability TEXT,"
+            " PRIMARY KEY (asin, ts)) WITHOUT ROWID"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS rollups ("
+            " asin TEXT NOT NULL, ts INTEGER NOT NULL, min_price INTEGER, max_price INTEGER,"
+            " sum_price INTEGER, n INTEGER, list_price INTEGER, availability TEXT,"
+            " PRIMARY KEY (asin, ts)) WITHOUT ROWID"
+        )
+        self.db.commit()
+
+    def record(self, asin: str, snap: dict, ts: int = None):
+        self.record_many([(asin, snap)], ts)
+
+    def record_many(self, rows, ts: int = None):
+        """
+        rows: iterable of (asin, snapshot); one transaction for the lot.
+        Samples are keyed per second: the first sample for an ASIN in a given
+        second is kept and later ones in that same second are ignored.
+        """
+        ts = int(ts or time.time())
+        params = [(a, ts, snap.get("price"), snap.get("list_price"), snap.get("availability")) for a, snap in rows]
+        if not params:
+            return
+        with self.lock:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO samples (asin, ts, price, list_price, availability) VALUES (?, ?, ?, ?, ?)",
+                params,
+            )
+            self.db.commit()
+
+    def compact(self):
+        """Fold raw samples older than HISTORY_RAW_DAYS into hourly rollups; drop data past HISTORY_MAX_DAYS."""
+        now = int(time.time())
+        cutoff = (now - HISTORY_RAW_DAYS * 86400) // self.BUCKET_SEC * self.BUCKET_SEC
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO rollups (asin, ts, min_price, max_price, sum_price, n, list_price, availability)"
+                " SELECT asin, ts - ts % ?, MIN(price), MAX(price), SUM(price), COUNT(price), MAX(list_price), MAX(availability)"
+                " FROM samples WHERE ts < ? GROUP BY asin, ts - ts % ?"
+                " ON CONFLICT(asin, ts) DO UPDATE SET"
+                "  min_price = COALESCE(MIN(min_price, excluded.min_price), min_price, excluded.min_price),"
+                "  max_price = COALESCE(MAX(max_price, excluded.max_price), max_price, excluded.max_price),"
+                "  sum_price = COALESCE(sum_price, 0) + COALESCE(excluded.sum_price, 0),"
+                "  n = n + excluded.n",
+                (self.BUCKET_SEC, cutoff, self.BUCKET_SEC),
+            )
+            self.db.execute("DELETE FROM samples WHERE ts < ?", (cutoff,))
+            self.db.execute("DELETE FROM rollups WHERE ts < ?", (now - HISTORY_MAX_DAYS * 86400,))
+            self.db.commit()
+
+    def stats(self, asin: str, days: float) -> dict:
+        """min/max/avg price over the last `days`, plus the latest sample."""
+        since = int(time.time() - days * 86400)
+        with self.lock:
+            raw = self.db.execute(
+                "SELECT MIN(price), MAX(price), SUM(price), COUNT(price) FROM samples WHERE asin = ? AND ts >= ?",
+                (asin, since)).fetchone()
+            rolled = self.db.execute(
+                "SELECT MIN(min_price), MAX(max_price), SUM(sum_price), SUM(n) FROM rollups WHERE asin = ? AND ts >= ?",
+                (asin, since)).fetchone()
+            latest = self.db.execute(
+                "SELECT ts, price, list_price, availability FROM samples WHERE asin = ? ORDER BY ts DESC LIMIT 1",
+                (asin,)).fetchone()
+        mins = [v for v in (raw[0], rolled[0]) if v is not None]
+        maxs = [v for v in (raw[1], rolled[1]) if v is not None]
+        total = (raw[2] or 0) + (rolled[2] or 0)
+        n = (raw[3] or 0) + (rolled[3] or 0)
+        out = {
+            "asin": asin,
+            "days": days,
+            "samples": n,
+            "min": min(mins) if mins else None,
+            "max": max(maxs) if maxs else None,
+            "avg": int(round(total / n)) if n else None,
+            "current": None,
+        }
+        if latest:
+            out["current"] = {"ts": latest[0], "price": latest[1], "list_price": latest[2], "availability": latest[3]}
+            if latest[1] is not None and out["min"] is not None:
+                out["lowest_in_window"] = latest[1] <= out["min"]
+        return out
+
+    def series(self, asin: str, days: float, bucket_sec: int) -> list:
+        """Downsampled [bucket_ts, min, max, avg] points over the window."""
+        since = int(time.time() - days * 86400)
+        bucket_sec = max(self.BUCKET_SEC, int(bucket_sec))
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT b, MIN(lo), MAX(hi), SUM(s), SUM(c) FROM ("
+                "  SELECT ts - ts % ? AS b, price AS lo, price AS hi, price AS s, (price IS NOT NULL) AS c"
+                "  FROM samples WHERE asin = ? AND ts >= ?"
+                "  UNION ALL"
+                "  SELECT ts - ts % ?, min_price, max_price, sum_price, n FROM rollups WHERE asin = ? AND ts >= ?"
+                ") GROUP BY b ORDER BY b",
+                (bucket_sec, asin, since, bucket_sec, asin, since)).fetchall()
+        return [[b, lo, hi, int(round(s / c)) if c else None] for b, lo, hi, s, c in rows]
+
+    def start_compactor(self, every_sec: int = 6 * 3600):
+        def _loop():
+            while True:
+                try:
+                    self.compact()
+                except Exception as e:
+                    print("[history] compact failed:", e)
+                time.sleep(every_sec)
+        threading.Thread(target=_loop, name="history-compact", daemon=True).start()
+
+PRICE_HISTORY = PriceHistory(HISTORY_DB)
+
+def _fmt_cents(c):
+    return "N/A" if c is None else f"${c / 100:,.2f}"
+
+def _diff_snapshots(asin: str, old: dict, new: dict):
+    events = []
+    if old.get("price") != new.get("price"):
+        kind = "price_change"
+        if old.get("price") is not None and new.get("price") is not None:
+            kind = "price_drop" if new["price"] < old["price"] else "price_rise"
+        events.append({"type": kind, "asin": asin, "from": old.get("price"), "to": new.get("price"),
+                       "text": f"{asin}: {_fmt_cents(old.get('price'))} → {_fmt_cents(new.get('price'))}"})
+    if (old.get("buybox"), old.get("amazon_fulfilled")) != (new.get("buybox"), new.get("amazon_fulfilled")):
+        events.append({"type": "buybox_change", "asin": asin,
+                       "from": {"buybox": old.get("buybox"), "amazon_fulfilled": old.get("amazon_fulfilled")},
+                       "to": {"buybox": new.get("buybox"), "amazon_fulfilled": new.get("amazon_fulfilled")},
+                       "text": f"{asin}: buy box {'Amazon' if new.get('amazon_fulfilled') else 'third-party'}"
+                               f"{'' if new.get('buybox') else ' (no winner)'}"})
+    if old.get("availability") != new.get("availability"):
+        events.append({"type": "availability_change", "asin": asin,
+                       "from": old.get("availability"), "to": new.get("availability"),
+                       "text": f"{asin}: {old.get('availability') or 'N/A'} → {new.get('availability') or 'N/A'}"})
+    return events
+
+class PriceWatcher:
+    """
+    Polls the tracked ASIN set every WATCH_INTERVAL_SEC through the batched,
+    throttled GetItems path (which records history samples) and reports changes to
+    WATCH_LOG_FILE and WATCH_WEBHOOK_URL. Cycles are skipped when they would
+    eat into WATCH_DAY_RESERVE of the daily quota. The set is capped at
+    WATCH_MAX, and each cycle sends one chunk at a time once the throttle is
+    idle, so the watcher never queues enough calls to hit CLIENT_THROTTLED.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.asins = OrderedDict()    # asin -> last snapshot (or None before the first poll)
+        self.last_poll = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                obj = json.load(f)
+            self.asins.update({a: snap for a, snap in (obj.get("asins") or {}).items()})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print("[watch] load failed:", e)
+
+    def _save(self):
+        # save_lock keeps an older snapshot from replacing a newer one
+        with self.save_lock:
+            with self.lock:
+                snapshot = {"asins": dict(self.asins)}
+            try:
+                _write_json_atomic(self.path, snapshot)
+            except Exception as e:
+                print("[watch] save failed:", e)
+
+    def add(self, asins) -> bool:
+        """Track asins; False (nothing added) if the set would grow past WATCH_MAX."""
+        with self.lock:
+            new = [a for a in dict.fromkeys(asins) if a not in self.asins]
+            if len(self.asins) + len(new) > WATCH_MAX:
+                return False
+            for a in new:
+                self.asins[a] = None
+        self._save()
+        return True
+
+    def remove(self, asins):
+        with self.lock:
+            for a in asins:
+                self.asins.pop(a, None)
+        self._save()
+
+    def list(self) -> dict:
+        with self.lock:
+            return {"asins": dict(self.asins), "last_poll": self.last_poll, "interval_sec": WATCH_INTERVAL_SEC,
+                    "max": WATCH_MAX}
+
+    def poll(self):
+        with self.lock:
+            asins = list(self.asins)
+        if not asins:
+            return
+        calls = -(-len(asins) // PAAPI_BATCH_SIZE)
+        if PAAPI_THROTTLE.stats()["day_remaining"] < calls + WATCH_DAY_RESERVE:
+            print("[watch] skipping cycle: daily PA-API quota reserved for lookups")
+            return
+        events = []
+        polled = 0
+        for i in range(0, len(asins), PAAPI_BATCH_SIZE):
+            chunk = asins[i:i + PAAPI_BATCH_SIZE]
+            # One chunk at a time, and only when no lookup is waiting on the throttle
+            if not PAAPI_THROTTLE.wait_for_headroom(WATCH_DAY_RESERVE, WATCH_CHUNK_WAIT_SEC):
+                print(f"[watch] throttle busy: polled {polled}/{len(asins)}, the rest go first next cycle")
+                break
+            raws = fetch_items(chunk)
+            now = int(time.time())
+            with self.lock:
+                for a in chunk:
+                    if a not in self.asins:
+                        continue
+                    # Least recently polled ASINs lead the next cycle
+                    self.asins.move_to_end(a)
+                    items = (raws.get(a) or {}).get("ItemsResult", {}).get("Items") or []
+                    if not items:
+                        continue
+                    snap = _price_snapshot(items[0])
+                    old = self.asins[a]
+                    if old is not None:
+                        events.extend(dict(ev, ts=now) for ev in _diff_snapshots(a, old, snap))
+                    self.asins[a] = snap
+                self.last_poll = now
+            polled += len(chunk)
+        if not polled:
+            return
+        self._save()
+        for ev in events:
+            _emit_price_event(ev)
+
+    def start(self):
+        def _loop():
+            while True:
+                try:
+                    self.poll()
+                except Exception as e:
+                    print("[watch] poll failed:", e)
+                time.sleep(max(60, WATCH_INTERVAL_SEC))
+        threading.Thread(target=_loop, name="price-watch", daemon=True).start()
+
+def _emit_price_event(ev: dict):
+    print("[watch]", ev["text"])
+    try:
+        with open(WATCH_LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(ev, ensure_ascii=False) + "\n")
+    except Exception as e:
+        print("[watch] log write failed:", e)
+    if WATCH_WEBHOOK_URL:
+        try:
+            requests.post(WATCH_WEBHOOK_URL, json={"content": f"📈 {ev['type']}: {ev['text']}"}, timeout=HTTP_TIMEOUT)
+        except Exception as e:
+            print("[watch] webhook failed:", e)
+
+def _watch_max_default() -> int:
+    """
+    Largest watch set one cycle can poll without crowding out lookups: at most
+    half the interval's per-second capacity, and within the daily quota left
+    after WATCH_DAY_RESERVE when the cycle repeats all day.
+    """
+    interval = max(60, WATCH_INTERVAL_SEC)
+    calls = min(PAAPI_TPS * interval / 2, max(0, PAAPI_TPD - WATCH_DAY_RESERVE) * interval / 86400.0)
+    return max(1, int(calls)) * PAAPI_BATCH_SIZE
+
+WATCH_MAX = int(_env("WATCH_MAX", "0")) or _watch_max_default()
+
+PRICE_WATCHER = PriceWatcher(WATCH_FILE)
+
+def handle_history(q: dict, series: bool = False):
+    asin = ((q.get("asin") or [""])[0]).strip().upper()
+    if len(asin) != 10:
+        return 400, {"error": {"code": "ASIN_INVALID", "message": "Provide a valid 10-char ASIN"}}
+    try:
+        days = float((q.get("days") or ["30"])[0])
+    except ValueError:
+        days = math.nan
+    if not math.isfinite(days) or days <= 0:
+        return 400, {"error": {"code": "BAD_REQUEST", "message": "days must be a positive number"}}
+    days = min(max(days, 1 / 24), HISTORY_MAX_DAYS)
+    if series:
+        try:
+            bucket = int(float((q.get("bucket") or ["86400"])[0] or 86400))
+        except (ValueError, OverflowError):
+            return 400, {"error": {"code": "BAD_REQUEST", "message": "bucket must be a number"}}
+        return 200, {"asin": asin, "days": days, "points": PRICE_HISTORY.series(asin, days, bucket)}
+    return 200, PRICE_HISTORY.stats(asin, days)
+
+def handle_watch_update(payload: dict, remove: bool = False):
+    asins = payload.get("asins")
+    if isinstance(asins, str):
+        asins = [asins]
+    asins = [str(a or "").strip().upper() for a in asins or []]
+    if not asins or any(len(a) != 10 for a in asins):
+        return 400, {"error": {"code": "ASIN_INVALID", "message": "Provide a list of valid 10-char ASINs"}}
+    if remove:
+        PRICE_WATCHER.remove(asins)
+    elif not PRICE_WATCHER.add(asins):
+        return 400, {"error": {"code": "WATCH_FULL",
+                               "message": f"Watch list is limited to {WATCH_MAX} ASINs at the current PA-API quota"}}
+    return 200, PRICE_WATCHER.list()
+# ============================================================================
+
+
+# ================= Server Runner ============================================
+class PooledHTTPServer(socketserver.TCPServer):
+    """TCPServer that handles each connection on a bounded worker pool."""
+    allow_reuse_address = True
+
+    def __init__(self, server_address, handler_cls, workers: int = PAAPI_HTTP_WORKERS):
+        super().__init__(server_address, handler_cls)
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="paapi-http")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False)
 # ============================================================================
 
 
@@ -709,9 +1745,12 @@ if __name__ == "__main__":
     res = paapi_post("GetItems", body)
     pprint(res)
     print("Test complete\n")
+    # Background price watcher for tracked ASINs, and history downsampling
+    PRICE_WATCHER.start()
+    PRICE_HISTORY.start_compactor()
     # Start server
-    with socketserver.TCPServer(("", PORT), Handler) as httpd:
-        print(f"PA-API Tool running on http://127.0.0.1:{PORT}")
-        print("Endpoints: POST /paapi/get-items, POST /paapi/search-items, GET /health")
+    with PooledHTTPServer(("", PORT), Handler) as httpd:
+        print(f"PA-API Tool running on http://127.0.0.1:{PORT} ({PAAPI_HTTP_WORKERS} workers)")
+        print("Endpoints: POST /paapi/get-items, POST /paapi/search-items, POST /paapi/price, POST /paapi/price-bulk, GET /history, GET /history/series, GET /watch, POST /watch/add, POST /watch/remove, GET /health")
         httpd.serve_forever()
 # ================= End File =================================================
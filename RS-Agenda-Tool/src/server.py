@@ -1,12 +1,21 @@
 # ================= RS Agenda Local Server (with Discord Scheduler) =================
 import http.server, socketserver, json, os, threading, time, uuid
-import io
+import atexit
+import copy
+import bisect
+import heapq
+import itertools
 import re
 import asyncio
+import tempfile
+import zipfile
 import sys
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 import requests
 from datetime import datetime, timedelta
+from urllib.parse import parse_qs
 
 # -------- Env / Config --------
 from dotenv import load_dotenv
@@ -18,6 +27,12 @@ DISCORD_BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN", "")
 DISCORD_GUILD_ID  = os.getenv("DISCORD_GUILD_ID", "")
 # Forum channel to receive !archive posts (optional)
 ARCHIVE_FORUM_ID = os.getenv("ARCHIVE_FORUM_ID", "")
+# Transcript files are split into parts of at most this size (capped by the guild's upload limit)
+ARCHIVE_PART_BYTES = int(os.getenv("ARCHIVE_PART_BYTES", str(8 * 1024 * 1024)) or 8 * 1024 * 1024)
+ARCHIVE_SPOOL_MEM = 1024 * 1024      # bytes kept in memory before a transcript part spills to disk
+ARCHIVE_PROGRESS_SEC = 5             # minimum seconds between progress message edits
+# `!archive zip`: concurrent attachment downloads bundled into zip parts
+ARCHIVE_IMAGE_WORKERS = int(os.getenv("ARCHIVE_IMAGE_WORKERS", "6") or 6)
 # Category IDs (text channels under these will be grouped)
 CAT_DAILY   = os.getenv("CAT_DAILY",   "1313260017989713981")
 CAT_INSTORE = os.getenv("CAT_INSTORE", "1400165387001135134")
@@ -35,10 +50,23 @@ HTTP_TIMEOUT = 12  # seconds
 
 # -------- State --------
 STATE_FILE = os.path.join(BASE_DIR, "config", "agenda_data.json")
+# UI saves are coalesced: agenda_data.json is written at most once per this many seconds
+STATE_SAVE_DEBOUNCE_SEC = float(os.getenv("STATE_SAVE_DEBOUNCE_SEC", "1.0") or 1.0)
+
+# Durable scheduler store: pending jobs are mirrored to SCHEDULE_FILE and reloaded on boot
+SCHEDULE_FILE = os.path.join(BASE_DIR, "config", "schedules.json")
+# Catch-up policy for jobs that came due while the server was down: skip | grace | all
+SCHED_CATCHUP = (os.getenv("SCHED_CATCHUP", "grace") or "grace").strip().lower()
+SCHED_CATCHUP_GRACE_MIN = int(os.getenv("SCHED_CATCHUP_GRACE_MIN", "10") or 10)
+# Worker threads that deliver due reminders (one dispatcher thread feeds them)
+SCHED_WORKERS = int(os.getenv("SCHED_WORKERS", "4") or 4)
+SCHED_BATCH_MAX = 500
 
-# in-memory scheduler store
 SCHEDULES: Dict[str, Dict] = {}
 SCHED_LOCK = threading.Lock()
+# Time-ordered index of pending jobs: sorted (eta_ms, sched_id, job_idx); guarded by SCHED_LOCK
+SCHED_UPCOMING: List[tuple] = []
+SCHED_BY_CHANNEL: Dict[str, set] = {}
 SCHED_CONFIGS: Dict[str, Dict] = {}
 
 # Discord bot runtime status
@@ -49,8 +77,21 @@ BOT_STATUS = {
     "latency_ms": None,
     "error": "",
 }
+# Guild channel directory cache (serves /fetch_channels; keeps health polling off the REST API)
+CHANNEL_CACHE_TTL = int(os.getenv("CHANNEL_CACHE_TTL", "300") or 300)
+CHANNEL_CACHE = {"channels": None, "fetched_at": 0.0, "error": "", "refreshing": False}
+CHANNEL_CACHE_LOCK = threading.Lock()
+# Gateway-maintained channel directory (id -> REST-shaped dict); authoritative while the bot is connected
+CHANNEL_DIR: Dict[str, Dict] = {}
+CHANNEL_DIR_READY = False
+# Seconds the REST refresher waits for the bot gateway before its first poll
+CHANNEL_GATEWAY_GRACE_SEC = 30
+
 BOT_THREAD = None
 _BOT_STARTED = False
+# Set once the bot is connected; scheduled sends are dispatched onto this loop
+BOT_CLIENT = None
+BOT_LOOP = None
 
 
 # ================= Helpers =================
@@ -87,6 +128,84 @@ def _safe_int(x, default=0):
     except Exception:
         return default
 
+class TranscriptSpool:
+    """
+    Streams transcript lines into spooled temp files. When a part would grow
+    past max_bytes it is closed and returned by write_line() so the caller can
+    upload it and drop it; only the open part is ever held.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(1024, int(max_bytes))
+        self.part = None
+        self.size = 0
+        self.lines = 0
+        self.parts = 0
+
+    def write_line(self, text: str):
+        data = (text + "\n").encode("utf-8")
+        finished = None
+        if self.part is not None and self.size + len(data) > self.max_bytes:
+            finished = self._close_part()
+        if self.part is None:
+            self.part = tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_MEM)
+            self.size = 0
+        self.part.write(data)
+        self.size += len(data)
+        self.lines += 1
+        return finished
+
+    def finish(self):
+        """Close and return the last part (None if nothing was written)."""
+        return self._close_part() if self.part is not None else None
+
+    def _close_part(self):
+        fp, self.part = self.part, None
+        fp.seek(0)
+        self.parts += 1
+        return fp
+
+class ZipPartWriter:
+    """
+    Bundles files into stored (uncompressed) zip parts kept under max_bytes.
+    add() returns the finished part when the next file would not fit.
+    """
+    ENTRY_OVERHEAD = 128   # local header + central directory record, excluding the name
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(1024, int(max_bytes))
+        self.fp = None
+        self.zf = None
+        self.size = 0
+        self.files = 0
+        self.parts = 0
+
+    def fits(self, name: str, nbytes: int) -> bool:
+        return nbytes + 2 * len(name.encode("utf-8")) + self.ENTRY_OVERHEAD + 22 <= self.max_bytes
+
+    def add(self, name: str, data: bytes):
+        cost = len(data) + 2 * len(name.encode("utf-8")) + self.ENTRY_OVERHEAD
+        finished = None
+        if self.zf is not None and self.size + cost + 22 > self.max_bytes:
+            finished = self._close_part()
+        if self.zf is None:
+            self.fp = tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_MEM)
+            self.zf = zipfile.ZipFile(self.fp, "w", compression=zipfile.ZIP_STORED)
+            self.size = 0
+        self.zf.writestr(name, data)
+        self.size += cost
+        self.files += 1
+        return finished
+
+    def finish(self):
+        return self._close_part() if self.zf is not None else None
+
+    def _close_part(self):
+        self.zf.close()
+        fp, self.fp, self.zf = self.fp, None, None
+        fp.seek(0)
+        self.parts += 1
+        return fp
+
 # ================= Optional: Discord Bot (commands) =================
 def start_discord_bot():
     global BOT_THREAD, _BOT_STARTED
@@ -99,6 +218,7 @@ def start_discord_bot():
         return
 
     def _worker():
+        global BOT_CLIENT
         try:
             try:
                 import discord
@@ -113,6 +233,7 @@ def start_discord_bot():
             intents.message_content = True  # requires privileged intent enabled
 
             bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
+            BOT_CLIENT = bot
 
             # ---------- Embed helpers ----------
             def make_embed(title: str = None, description: str = None, color: int = 0x5865F2):
@@ -158,6 +279,8 @@ def start_discord_bot():
 
             @bot.event
             async def on_ready():
+                global BOT_LOOP
+                BOT_LOOP = asyncio.get_running_loop()
                 try:
                     me = bot.user
                     BOT_STATUS.update({
@@ -170,6 +293,29 @@ def start_discord_bot():
                     await bot.change_presence(activity=discord.Game(name="RS Agenda"))
                 except Exception as e:
                     BOT_STATUS.update({"online": True, "error": str(e)[:200]})
+                gid = _safe_int(DISCORD_GUILD_ID)
+                guild = bot.get_guild(gid) if gid else None
+                if guild is not None:
+                    gateway_channels_replace(guild.channels)
+
+            def _is_our_guild_channel(channel):
+                gid = _safe_int(DISCORD_GUILD_ID)
+                return bool(gid) and getattr(getattr(channel, "guild", None), "id", None) == gid
+
+            @bot.event
+            async def on_guild_channel_create(channel):
+                if _is_our_guild_channel(channel):
+                    gateway_channel_upsert(channel)
+
+            @bot.event
+            async def on_guild_channel_update(before, after):
+                if _is_our_guild_channel(after):
+                    gateway_channel_upsert(after)
+
+            @bot.event
+            async def on_guild_channel_delete(channel):
+                if _is_our_guild_channel(channel):
+                    gateway_channel_remove(channel.id)
 
             def _is_same_guild(ctx):
                 try:
@@ -232,7 +378,7 @@ def start_discord_bot():
                     "• !setlive <message>\n"
                     "• !schedule\n"
                     "• !tz\n\n"
-                    "Mods only: !delete, !transfer <daily|instore|upcoming>, !archive"
+                    "Mods only: !delete, !transfer <daily|instore|upcoming>, !archive [zip]"
                 )
                 await ctx.send(embed=make_embed(title="RS Agenda Commands", description=desc))
 
@@ -267,13 +413,81 @@ def start_discord_bot():
                 except Exception as e:
                     await ctx.send(embed=make_embed(title="Transfer failed", description=str(e), color=0xED4245))
 
+            async def _rehost_images(images, thread, progress, part_limit):
+                """
+                Download attachments with bounded concurrency and upload them to the
+                thread as zip parts. Downloads run ahead in a sliding window while
+                results are consumed in message order, so parts keep that order.
+                """
+                sem = asyncio.Semaphore(max(1, ARCHIVE_IMAGE_WORKERS))
+
+                async def _fetch(url):
+                    async with sem:
+                        try:
+                            return await bot.http.get_from_cdn(url)
+                        except Exception:
+                            return None
+
+                zw = ZipPartWriter(part_limit)
+                failed, oversized = [], []
+                uploaded = 0
+                last_progress = time.time()
+
+                async def _upload(fp):
+                    nonlocal uploaded
+                    uploaded += 1
+                    try:
+                        await thread.send(content=f"Images part {uploaded}:", file=discord.File(fp, filename=f"images.part{uploaded}.zip"))
+                    finally:
+                        fp.close()
+
+                window = max(1, ARCHIVE_IMAGE_WORKERS) * 2
+                pending = [asyncio.ensure_future(_fetch(u)) for u, _ in images[:window]]
+                for i, (url, filename) in enumerate(images):
+                    data = await pending[i]
+                    pending[i] = None
+                    if i + window < len(images):
+                        pending.append(asyncio.ensure_future(_fetch(images[i + window][0])))
+                    if data is None:
+                        failed.append(url)
+                        continue
+                    name = f"{i + 1:05d}-{filename}"
+                    if not zw.fits(name, len(data)):
+                        oversized.append(url)
+                        continue
+                    done = zw.add(name, data)
+                    if done is not None:
+                        await _upload(done)
+                    if time.time() - last_progress >= ARCHIVE_PROGRESS_SEC:
+                        last_progress = time.time()
+                        try:
+                            await progress.edit(content=f"📦 Bundling images… {i + 1:,}/{len(images):,}, {uploaded} zip part(s) uploaded")
+                        except Exception:
+                            pass
+                last = zw.finish()
+                if last is not None:
+                    await _upload(last)
+
+                leftovers = [("Images not downloaded", failed), ("Images over the upload limit", oversized)]
+                for label, urls in leftovers:
+                    B = 10
+                    for j in range(0, len(urls), B):
+                        await thread.send(content=f"{label}:\n" + "\n".join(urls[j:j+B]))
+                try:
+                    await progress.edit(content=f"📦 Images done: {zw.files:,} in {uploaded} zip part(s), {len(failed) + len(oversized)} linked")
+                except Exception:
+                    pass
+
             @bot.command(name="archive")
-            async def _archive(ctx: commands.Context):
+            async def _archive(ctx: commands.Context, mode: str = ""):
                 """Archive the entire channel into a Forum post and delete the channel.
                 - Uses ARCHIVE_FORUM_ID from apikeys.env
-                - Attaches a full text transcript (oldest → newest)
-                - Posts image attachment URLs in batches for preview
+                - Attaches a full text transcript (oldest → newest), streamed to temp
+                  files and split into parts under the upload limit
+                - Posts image attachment URLs in batches for preview, or with
+                  `!archive zip` downloads them concurrently and uploads zip parts
                 """
+                rehost = (mode or "").strip().lower() == "zip"
                 if not _is_same_guild(ctx):
                     return
                 if not _mod_only(ctx):
@@ -342,10 +556,27 @@ def start_discord_bot():
                     except Exception:
                         thread = thread_tuple  # older versions may return Thread directly
 
-                    # Build transcript and collect image URLs
-                    lines = []
+                    # Stream the transcript to spooled temp files, uploading each part as it fills
+                    part_limit = min(ARCHIVE_PART_BYTES, int(getattr(ctx.guild, "filesize_limit", 0) or ARCHIVE_PART_BYTES))
+                    spool = TranscriptSpool(part_limit)
+                    uploaded = 0
+                    scanned = 0
                     image_urls = []
+                    progress = await ctx.send("📦 Archiving… 0 messages")
+                    last_progress = time.time()
+
+                    async def _upload_part(fp, single=False):
+                        nonlocal uploaded
+                        uploaded += 1
+                        name = f"archive-#{ctx.channel.name}.txt" if single else f"archive-#{ctx.channel.name}.part{uploaded}.txt"
+                        label = "Transcript attached:" if single else f"Transcript part {uploaded}:"
+                        try:
+                            await thread.send(content=label, file=discord.File(fp, filename=name))
+                        finally:
+                            fp.close()
+
                     async for m in ctx.channel.history(limit=None, oldest_first=True):
+                        scanned += 1
                         ts = m.created_at.strftime("%Y-%m-%d %H:%M:%S") if m.created_at else ""
                         author = getattr(m.author, "display_name", getattr(m.author, "name", "user"))
                         content = (m.content or "").replace("\r\n", "\n").replace("\r", "\n")
@@ -358,21 +589,37 @@ def start_discord_bot():
                                 ct = (getattr(a, "content_type", "") or "").lower()
                                 fn = (getattr(a, "filename", "") or "").lower()
                                 if ct.startswith("image/") or fn.endswith((".png",".jpg",".jpeg",".gif",".webp")):
-                                    image_urls.append(url)
+                                    image_urls.append((url, getattr(a, "filename", "") or "image"))
                         full = base if not attach_lines else (base + ("\n" + "\n".join(attach_lines) if base else "\n".join(attach_lines)))
                         if full:
-                            lines.append(full)
+                            done = spool.write_line(full)
+                            if done is not None:
+                                await _upload_part(done)
+                        if time.time() - last_progress >= ARCHIVE_PROGRESS_SEC:
+                            last_progress = time.time()
+                            try:
+                                await progress.edit(content=f"📦 Archiving… {scanned:,} messages, {uploaded} transcript part(s) uploaded")
+                            except Exception:
+                                pass
 
-                    transcript = "\n".join(lines) if lines else "(no messages)"
-                    fp = io.BytesIO(transcript.encode("utf-8"))
-                    await thread.send(content="Transcript attached:", file=discord.File(fp, filename=f"archive-#{ctx.channel.name}.txt"))
+                    if spool.lines == 0:
+                        spool.write_line("(no messages)")
+                    last = spool.finish()
+                    if last is not None:
+                        await _upload_part(last, single=(uploaded == 0))
+                    try:
+                        await progress.edit(content=f"📦 Transcript done: {scanned:,} messages in {uploaded} file(s)")
+                    except Exception:
+                        pass
 
-                    # Post image URLs in batches so Discord previews them
-                    if image_urls:
+                    if image_urls and rehost:
+                        await _rehost_images(image_urls, thread, progress, part_limit)
+                    elif image_urls:
+                        # Post image URLs in batches so Discord previews them
                         B = 10
                         total = (len(image_urls) + B - 1) // B
                         for i in range(0, len(image_urls), B):
-                            part = image_urls[i:i+B]
+                            part = [u for u, _ in image_urls[i:i+B]]
                             await thread.send(content=f"Images ({i//B + 1}/{total}):\n" + "\n".join(part))
 
                     await ctx.message.add_reaction("✅")
@@ -417,10 +664,11 @@ def start_discord_bot():
                 if not _mod_only(ctx):
                     return await reply_embed(ctx, "❌ Need Manage Channels permission.", title="setdrop", color=0xED4245)
 
-                # list pending configs
+                # list pending configs and the next scheduled sends
                 if len(args) >= 1 and str(args[0]).lower() in ("list", "ls"):
                     items = list(SCHED_CONFIGS.items())
-                    if not items:
+                    upcoming = list_upcoming(limit=10)
+                    if not items and not upcoming:
                         return await reply_embed(ctx, "No pending drops. Use: !setdrop YYYY-MM-DD HH:MM [#channel]", title="setdrop")
                     lines = []
                     for idx, (ch_id, cfg) in enumerate(items, start=1):
@@ -432,7 +680,16 @@ def start_discord_bot():
                         else:
                             when_str = "(no time)"
                         lines.append(f"drop{idx} — {name} — {when_str}")
-                    return await ctx.send(embed=make_embed(title="Pending Drops", description="\n".join(lines)))
+                    if upcoming:
+                        if lines:
+                            lines.append("")
+                        lines.append("Scheduled (next 10):")
+                        for job in upcoming:
+                            ch = ctx.guild.get_channel(_safe_int(job["channel_id"]))
+                            name = f"#{getattr(ch, 'name', job['channel_id'])}"
+                            when_str = time.strftime("%Y-%m-%d %H:%M", time.localtime(job["eta_ms"]/1000))
+                            lines.append(f"{when_str} — {name} — {job['label']}")
+                    return await ctx.send(embed=make_embed(title="Pending Drops", description="\n".join(lines)[:4000]))
 
                 # remove by id index
                 if len(args) >= 1 and str(args[0]).lower() in ("remove", "rm", "delete"):
@@ -602,9 +859,24 @@ def start_discord_bot():
     BOT_THREAD = threading.Thread(target=_worker, name="discord-bot", daemon=True)
     BOT_THREAD.start()
 
+def _bot_ready() -> bool:
+    try:
+        return bool(BOT_CLIENT and BOT_LOOP and BOT_LOOP.is_running()
+                    and BOT_CLIENT.is_ready() and not BOT_CLIENT.is_closed())
+    except Exception:
+        return False
+
+async def _bot_send(channel_id: str, content: str) -> dict:
+    cid = int(channel_id)
+    ch = BOT_CLIENT.get_channel(cid) or await BOT_CLIENT.fetch_channel(cid)
+    msg = await ch.send(content)
+    return {"id": str(msg.id), "content": msg.content, "channel_id": str(ch.id)}
+
 def send_discord_message(channel_id: str, content: str) -> dict:
     """
-    Fire-and-forget message send to Discord channel.
+    Send a message to a Discord channel.
+    Runs on the bot's event loop when it is connected (shared connection,
+    cache and rate limiting); falls back to a REST call otherwise.
     Returns JSON {id, content, ...} on success or {'error': ...} on failure.
     """
     if not channel_id or not content:
@@ -612,6 +884,22 @@ def send_discord_message(channel_id: str, content: str) -> dict:
     if not DISCORD_BOT_TOKEN:
         return {"error": "Bot token missing"}
 
+    # Never block the bot's own loop thread waiting on itself
+    if _bot_ready() and threading.current_thread() is not BOT_THREAD:
+        try:
+            fut = asyncio.run_coroutine_threadsafe(_bot_send(channel_id, content), BOT_LOOP)
+        except RuntimeError:
+            fut = None  # loop closed between the check and the submit
+        if fut is not None:
+            try:
+                return fut.result(timeout=HTTP_TIMEOUT)
+            except concurrent.futures.TimeoutError:
+                # The send may still complete; don't retry over REST and risk a duplicate
+                fut.cancel()
+                return {"error": "timed out waiting for bot send"}
+            except Exception as e:
+                return {"error": str(e)[:200]}
+
     url = f"https://discord.com/api/v10/channels/{channel_id}/messages"
     payload = {"content": content}
     try:
@@ -631,20 +919,246 @@ def fetch_guild_channels():
         raise RuntimeError(f"Discord API error {r.status_code}: {r.text[:200]}")
     return r.json()
 
+def _channel_to_dict(ch) -> dict:
+    """Shape a discord.py channel like the REST /guilds/{id}/channels payload."""
+    ctype = getattr(ch, "type", None)
+    parent = getattr(ch, "category_id", None)
+    return {
+        "id": str(ch.id),
+        "type": getattr(ctype, "value", ctype),
+        "parent_id": str(parent) if parent else None,
+        "name": getattr(ch, "name", "") or "",
+        "position": getattr(ch, "position", 0) or 0,
+    }
+
+def gateway_channels_replace(channels):
+    global CHANNEL_DIR_READY
+    entries = {str(ch.id): _channel_to_dict(ch) for ch in channels}
+    with CHANNEL_CACHE_LOCK:
+        CHANNEL_DIR.clear()
+        CHANNEL_DIR.update(entries)
+        CHANNEL_DIR_READY = True
+
+def gateway_channel_upsert(ch):
+    with CHANNEL_CACHE_LOCK:
+        CHANNEL_DIR[str(ch.id)] = _channel_to_dict(ch)
+
+def gateway_channel_remove(channel_id):
+    with CHANNEL_CACHE_LOCK:
+        CHANNEL_DIR.pop(str(channel_id), None)
+
+def _gateway_directory_live() -> bool:
+    return CHANNEL_DIR_READY and _bot_ready()
+
+def _refresh_channel_cache():
+    """Fetch the guild channel list over REST and store it in CHANNEL_CACHE."""
+    try:
+        channels = fetch_guild_channels()
+    except Exception as e:
+        with CHANNEL_CACHE_LOCK:
+            CHANNEL_CACHE["error"] = str(e)[:200]
+        raise
+    with CHANNEL_CACHE_LOCK:
+        CHANNEL_CACHE.update({"channels": channels, "fetched_at": time.time(), "error": ""})
+    return channels
+
+def _refresh_channel_cache_async():
+    with CHANNEL_CACHE_LOCK:
+        if CHANNEL_CACHE["refreshing"]:
+            return
+        CHANNEL_CACHE["refreshing"] = True
+
+    def _run():
+        try:
+            _refresh_channel_cache()
+        except Exception:
+            pass
+        finally:
+            with CHANNEL_CACHE_LOCK:
+                CHANNEL_CACHE["refreshing"] = False
+
+    threading.Thread(target=_run, name="channel-cache-refresh", daemon=True).start()
+
+def get_guild_channels(force: bool = False):
+    """
+    Guild channels, from the gateway directory while the bot is connected,
+    otherwise from CHANNEL_CACHE. A stale cache entry is served while a
+    background refresh runs; only a cold cache (or force) blocks on REST.
+    """
+    if _gateway_directory_live():
+        with CHANNEL_CACHE_LOCK:
+            channels = list(CHANNEL_DIR.values())
+        return sorted(channels, key=lambda ch: (ch.get("position") or 0, ch["id"]))
+    with CHANNEL_CACHE_LOCK:
+        channels = CHANNEL_CACHE["channels"]
+        age = time.time() - CHANNEL_CACHE["fetched_at"]
+    if force or channels is None:
+        return _refresh_channel_cache()
+    if age >= CHANNEL_CACHE_TTL:
+        _refresh_channel_cache_async()
+    return channels
+
+def start_channel_refresher():
+    """Keep CHANNEL_CACHE warm so HTTP handlers rarely wait on Discord."""
+    if not (DISCORD_BOT_TOKEN and DISCORD_GUILD_ID):
+        return
+
+    def _loop():
+        # Give the bot a chance to log in first so a healthy gateway never triggers REST polling
+        deadline = time.time() + CHANNEL_GATEWAY_GRACE_SEC
+        while BOT_THREAD is not None and BOT_THREAD.is_alive() and not _gateway_directory_live() \
+                and time.time() < deadline:
+            time.sleep(1)
+        while True:
+            # Gateway events keep CHANNEL_DIR fresh; REST is only the fallback
+            if not _gateway_directory_live():
+                try:
+                    _refresh_channel_cache()
+                except Exception as e:
+                    print(f"[channels] refresh failed: {e}")
+            time.sleep(max(30, CHANNEL_CACHE_TTL))
+
+    threading.Thread(target=_loop, name="channel-refresher", daemon=True).start()
+
+def discord_health() -> dict:
+    """Connectivity from the bot gateway (or the last channel refresh); makes no Discord calls."""
+    if _bot_ready():
+        try:
+            BOT_STATUS["latency_ms"] = int(BOT_CLIENT.latency * 1000)
+        except Exception:
+            pass
+        return {"ok": True, "source": "gateway"}
+    with CHANNEL_CACHE_LOCK:
+        fetched_at = CHANNEL_CACHE["fetched_at"]
+        error = CHANNEL_CACHE["error"]
+    if fetched_at and not error and time.time() - fetched_at < 2 * CHANNEL_CACHE_TTL:
+        return {"ok": True, "source": "rest", "age_s": int(time.time() - fetched_at)}
+    return {"ok": False, "error": error or "Discord bot offline"}
+
+# ---- Agenda state store ----
+class AgendaStateStore:
+    """
+    In-memory authoritative copy of agenda_data.json. Updates replace whole
+    top-level sections under a lock; unchanged sections don't mark the store
+    dirty, and dirty state is written atomically after a short debounce so a
+    burst of UI autosaves costs one write.
+    """
+    def __init__(self, path: str, debounce_sec: float):
+        self.path = path
+        self.debounce_sec = max(0.0, debounce_sec)
+        self.lock = threading.RLock()
+        self.data = None
+        self.version = 0          # bumped on every change
+        self.saved_version = 0    # last version known to be on disk
+        self.write_lock = threading.Lock()   # serializes file writes so an older payload can't land last
+        self.timer = None
+
+    def _load(self):
+        """Read the file once. Caller must hold the lock."""
+        if self.data is not None:
+            return
+        self.data = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                obj = json.load(f)
+            if isinstance(obj, dict):
+                self.data = obj
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[state] could not read {self.path}: {e}")
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            self._load()
+            return copy.deepcopy(self.data)
+
+    def section(self, key, default=None):
+        with self.lock:
+            self._load()
+            return copy.deepcopy(self.data.get(key, default))
+
+    def patch(self, sections: dict) -> bool:
+        """Replace the given top-level sections; returns True if anything changed."""
+        with self.lock:
+            self._load()
+            changed = False
+            for key, value in (sections or {}).items():
+                if self.data.get(key) != value:
+                    self.data[key] = copy.deepcopy(value)
+                    changed = True
+            if changed:
+                self._mark_dirty()
+            return changed
+
+    def replace(self, obj: dict) -> bool:
+        """Swap in a whole document (the UI's Save button); sections not present are dropped."""
+        with self.lock:
+            self._load()
+            if self.data == obj:
+                return False
+            self.data = copy.deepcopy(obj)
+            self._mark_dirty()
+            return True
+
+    def _mark_dirty(self):
+        """Caller must hold the lock."""
+        self.version += 1
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Caller must hold the lock."""
+        if self.timer is None:
+            self.timer = threading.Timer(self.debounce_sec, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        """Write the document now if it has unsaved changes."""
+        with self.write_lock:
+            with self.lock:
+                self.timer = None
+                if self.version == self.saved_version:
+                    return
+                version = self.version
+                payload = json.dumps(self.data, ensure_ascii=False, separators=(",", ":"))
+            tmp = None
+            try:
+                folder = os.path.dirname(self.path)
+                os.makedirs(folder, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(prefix=".agenda_data.", suffix=".tmp", dir=folder)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+                tmp = None
+                with self.lock:
+                    self.saved_version = max(self.saved_version, version)
+            except Exception as e:
+                print(f"[state] save failed: {e}")
+                with self.lock:
+                    self._schedule_flush()
+            finally:
+                if tmp:
+                    try:
+                        os.remove(tmp)
+                    except OSError:
+                        pass
+
+STATE = AgendaStateStore(STATE_FILE, STATE_SAVE_DEBOUNCE_SEC)
+atexit.register(STATE.flush)
+
 def categorize_channels(all_channels):
     # type 0 = text channels
     daily, instore, upcoming = [], [], []
 
     # Preserve existing notes
     existing = {}
-    try:
-        with open(STATE_FILE, "r", encoding="utf-8") as f:
-            cur = json.load(f)
-        for k in ("daily", "instore", "upcoming"):
-            for ch in cur.get(k, []):
+    for k in ("daily", "instore", "upcoming"):
+        for ch in STATE.section(k) or []:
+            if isinstance(ch, dict):
                 existing[str(ch.get("id"))] = ch.get("notes", "")
-    except Exception:
-        pass
 
     for ch in all_channels:
         if str(ch.get("type")) != "0":
@@ -664,59 +1178,353 @@ def categorize_channels(all_channels):
     return {"daily": daily, "instore": instore, "upcoming": upcoming}
 
 def autosave_state(new_chunks):
+    STATE.patch({
+        "daily":    new_chunks.get("daily", []),
+        "instore":  new_chunks.get("instore", []),
+        "upcoming": new_chunks.get("upcoming", []),
+        "optional": new_chunks.get("optional", []),
+    })
     current = {"daily": [], "instore": [], "upcoming": [], "optional": [], "output": ""}
-    try:
-        with open(STATE_FILE, "r", encoding="utf-8") as f:
-            obj = json.load(f)
-        if isinstance(obj, dict):
-            current.update(obj)
-    except Exception:
-        pass
-    current["daily"]   = new_chunks.get("daily", [])
-    current["instore"] = new_chunks.get("instore", [])
-    current["upcoming"]= new_chunks.get("upcoming", [])
-    current["optional"]= new_chunks.get("optional", [])
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(current, f, ensure_ascii=False, indent=2)
+    current.update(STATE.snapshot())
     return current
 
 # ---- Scheduler helpers ----
-def _schedule_one(eta_ms: int, label: str, channel_id: str, content: str, sched_id: str):
+def _persist_schedules():
+    """Atomically write pending schedules to SCHEDULE_FILE. Caller must hold SCHED_LOCK."""
+    snapshot = {
+        sid: {k: v for k, v in obj.items() if k != "handles"}
+        for sid, obj in SCHEDULES.items()
+    }
+    tmp = SCHEDULE_FILE + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(SCHEDULE_FILE), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, SCHEDULE_FILE)
+    except Exception as e:
+        print(f"[scheduler] persist failed: {e}")
+
+def _index_add(sched_id: str):
+    """Index a schedule's pending jobs. Caller must hold SCHED_LOCK."""
+    obj = SCHEDULES[sched_id]
+    for idx, job in enumerate(obj.get("jobs") or []):
+        if job.get("status") == "pending":
+            bisect.insort(SCHED_UPCOMING, (int(job.get("eta_ms") or 0), sched_id, idx))
+    SCHED_BY_CHANNEL.setdefault(str(obj.get("channel_id", "")), set()).add(sched_id)
+
+def _index_remove_job(sched_id: str, idx: int):
+    """Drop one job from the upcoming index. Caller must hold SCHED_LOCK."""
+    job = SCHEDULES[sched_id]["jobs"][idx]
+    key = (int(job.get("eta_ms") or 0), sched_id, idx)
+    pos = bisect.bisect_left(SCHED_UPCOMING, key)
+    if pos < len(SCHED_UPCOMING) and SCHED_UPCOMING[pos] == key:
+        del SCHED_UPCOMING[pos]
+
+def _index_remove(sched_id: str):
+    """Drop a whole schedule from the indexes. Caller must hold SCHED_LOCK."""
+    obj = SCHEDULES[sched_id]
+    for idx, job in enumerate(obj.get("jobs") or []):
+        if job.get("status") == "pending":
+            _index_remove_job(sched_id, idx)
+    ids = SCHED_BY_CHANNEL.get(str(obj.get("channel_id", "")))
+    if ids is not None:
+        ids.discard(sched_id)
+        if not ids:
+            SCHED_BY_CHANNEL.pop(str(obj.get("channel_id", "")), None)
+
+def list_upcoming(limit: int = 50, channel_id: str = "", sched_id: str = "") -> List[dict]:
+    """Next pending jobs in ETA order, optionally for one channel or one drop."""
+    out: List[dict] = []
+    with SCHED_LOCK:
+        allowed = None
+        if sched_id:
+            allowed = {sched_id}
+        if channel_id:
+            by_chan = SCHED_BY_CHANNEL.get(str(channel_id), set())
+            allowed = by_chan if allowed is None else (allowed & by_chan)
+        for eta_ms, sid, idx in SCHED_UPCOMING:
+            if allowed is not None and sid not in allowed:
+                continue
+            obj = SCHEDULES[sid]
+            job = obj["jobs"][idx]
+            out.append({
+                "id": sid,
+                "channel_id": obj.get("channel_id", ""),
+                "drop_ts_ms": obj.get("drop_ts_ms"),
+                "label": job.get("label", ""),
+                "eta_ms": eta_ms,
+                "content": job.get("content", ""),
+            })
+            if len(out) >= limit:
+                break
+    return out
+
+def list_schedules(channel_id: str = "") -> List[dict]:
+    """Per-drop summaries (jobs with status), ordered by drop time."""
+    with SCHED_LOCK:
+        if channel_id:
+            ids = list(SCHED_BY_CHANNEL.get(str(channel_id), set()))
+        else:
+            ids = list(SCHEDULES.keys())
+        out = [
+            {
+                "id": sid,
+                "channel_id": SCHEDULES[sid].get("channel_id", ""),
+                "drop_ts_ms": SCHEDULES[sid].get("drop_ts_ms"),
+                "created_ms": SCHEDULES[sid].get("created_ms"),
+                "jobs": [
+                    {k: j.get(k) for k in ("label", "eta_ms", "status")}
+                    for j in SCHEDULES[sid].get("jobs") or []
+                ],
+            }
+            for sid in ids
+        ]
+    out.sort(key=lambda d: int(d.get("drop_ts_ms") or 0))
+    return out
+
+def _finish_job(sched_id: str, idx: int, status: str, msg_id: str = ""):
+    """Record a job outcome; drop the schedule once nothing is pending."""
+    with SCHED_LOCK:
+        obj = SCHEDULES.get(sched_id)
+        if not obj:
+            return
+        job = obj["jobs"][idx]
+        if job.get("status") == "pending":
+            _index_remove_job(sched_id, idx)
+        job["status"] = status
+        if msg_id:
+            job["msg_id"] = msg_id
+        if not any(j.get("status") == "pending" for j in obj["jobs"]):
+            _index_remove(sched_id)
+            SCHEDULES.pop(sched_id, None)
+        _persist_schedules()
+
+class _JobQueue:
     """
-    Create a timer to send at eta_ms (epoch ms). If eta already passed, return None.
+    Single dispatcher thread over a min-heap of (eta_ms, seq, fn).
+    Due jobs run on a small worker pool, so thread count stays constant
+    regardless of how many reminders are pending. Insert is O(log n);
+    cancel is O(1) (entries are discarded lazily when they reach the top).
+    """
+
+    def __init__(self, workers: int):
+        self._heap: List[tuple] = []
+        self._cv = threading.Condition()
+        self._seq = itertools.count()
+        self._cancelled = set()
+        self._live = set()    # handles still in the heap
+        self._workers = workers
+        self._pool = None
+        self._thread = None
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="sched-worker")
+            self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+            self._thread.start()
+
+    def push(self, eta_ms: int, fn) -> int:
+        with self._cv:
+            self._ensure_started()
+            handle = next(self._seq)
+            heapq.heappush(self._heap, (int(eta_ms), handle, fn))
+            self._live.add(handle)
+            self._cv.notify()
+            return handle
+
+    def cancel(self, handle: int):
+        """Drop a queued job; handles that already ran (or were cancelled) are ignored."""
+        with self._cv:
+            if handle not in self._live:
+                return
+            self._live.discard(handle)
+            self._cancelled.add(handle)
+            self._cv.notify()
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while not self._heap:
+                    self._cv.wait()
+                eta_ms, handle, fn = self._heap[0]
+                if handle in self._cancelled:
+                    heapq.heappop(self._heap)
+                    self._cancelled.discard(handle)
+                    continue
+                delay = (eta_ms - int(time.time() * 1000)) / 1000.0
+                if delay > 0:
+                    # Wakes early on push/cancel so a sooner job is never missed
+                    self._cv.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+                self._live.discard(handle)
+            self._pool.submit(fn)
+
+
+SCHED_QUEUE = _JobQueue(SCHED_WORKERS)
+
+def _schedule_one(eta_ms: int, label: str, channel_id: str, content: str, sched_id: str, idx: int,
+                  catchup: bool = False):
+    """
+    Queue a send at eta_ms (epoch ms). If eta already passed, return None
+    unless catchup is set, in which case the send is queued to run now.
+    Returns a SCHED_QUEUE handle for cancellation.
     """
     now_ms = int(time.time() * 1000)
     delay = (eta_ms - now_ms) / 1000.0
-    if delay <= 0:
+    if delay <= 0 and not catchup:
         return None
+    kind = "catch-up " if catchup else ""
 
     def task():
         res = send_discord_message(channel_id, content)
         # log to console (no emojis)
         stamp = time.strftime("%Y-%m-%d %H:%M:%S")
         if "error" in res:
-            print(f"[{stamp}] scheduler {sched_id} • {label} • send ERR: {res['error']}")
+            print(f"[{stamp}] scheduler {sched_id} • {label} • {kind}send ERR: {res['error']}")
+            _finish_job(sched_id, idx, "failed")
         else:
-            print(f"[{stamp}] scheduler {sched_id} • {label} • sent msg_id={res.get('id')}")
+            print(f"[{stamp}] scheduler {sched_id} • {label} • {kind}sent msg_id={res.get('id')}")
+            _finish_job(sched_id, idx, "sent", str(res.get("id") or ""))
 
-    t = threading.Timer(delay, task)
-    t.daemon = True
-    t.start()
-    return t
+    # Overdue catch-ups keep their original ETA so the queue sends them oldest first
+    return SCHED_QUEUE.push(eta_ms, task)
 
-def schedule_drop(channel_id: str, drop_ts_ms: int, msg30: str, msg15: str, msg_live: str):
+def _register_schedules(specs: List[tuple]) -> List[tuple]:
     """
-    DEPRECATED: Use schedule_drop_custom() instead for more flexibility.
-    
-    Create up to three timers: T-30min, T-15min, T-0min.
-    Only future ones will be scheduled. Returns (sched_id, etas[])
+    Persist and arm several schedules under one lock with a single write.
+    specs: [(channel_id, drop_ts_ms, schedule_points, messages), ...]
+    Returns [(sched_id, etas[]), ...] in the same order. A schedule with no
+    future job is neither stored nor persisted, and its sched_id is None.
     """
+    now_ms = int(time.time() * 1000)
+    prepared = []
+    for channel_id, drop_ts_ms, schedule_points, messages in specs:
+        jobs = [
+            {"label": label, "eta_ms": int(eta_ms), "content": content,
+             "status": "pending" if eta_ms > now_ms else "skipped"}
+            for label, eta_ms, content in schedule_points
+        ]
+        etas: List[dict] = [
+            {"label": j["label"], "eta_ms": j["eta_ms"], "scheduled": j["status"] == "pending"}
+            for j in jobs
+        ]
+        sched_id = uuid.uuid4().hex if any(j["status"] == "pending" for j in jobs) else None
+        prepared.append((sched_id, channel_id, drop_ts_ms, jobs, etas, messages))
+
+    with SCHED_LOCK:
+        for sched_id, channel_id, drop_ts_ms, jobs, _, messages in prepared:
+            if sched_id is None:
+                continue
+            SCHEDULES[sched_id] = {
+                "channel_id": channel_id,
+                "drop_ts_ms": drop_ts_ms,
+                "jobs": jobs,
+                "handles": [],
+                "messages": messages,
+                "created_ms": now_ms,
+            }
+        # Persist before arming so a crash right after scheduling loses nothing
+        _persist_schedules()
+        expired = []
+        for i, (sched_id, channel_id, _, jobs, etas, _) in enumerate(prepared):
+            if sched_id is None:
+                continue
+            for idx, job in enumerate(jobs):
+                if job["status"] != "pending":
+                    continue
+                h = _schedule_one(job["eta_ms"], job["label"], channel_id, job["content"], sched_id, idx)
+                if h is not None:
+                    SCHEDULES[sched_id]["handles"].append(h)
+                else:
+                    job["status"] = "skipped"
+                    etas[idx]["scheduled"] = False
+            if SCHEDULES[sched_id]["handles"]:
+                _index_add(sched_id)
+            else:
+                # Every job came due while arming; nothing left to send
+                SCHEDULES.pop(sched_id, None)
+                expired.append(i)
+        if expired:
+            _persist_schedules()
+    return [(None if i in expired else p[0], p[4]) for i, p in enumerate(prepared)]
+
+def _register_schedule(channel_id: str, drop_ts_ms: int, schedule_points: List[tuple], messages: dict):
+    """Persist a schedule and arm its future jobs. Returns (sched_id, etas[])."""
+    return _register_schedules([(channel_id, drop_ts_ms, schedule_points, messages)])[0]
+
+def restore_schedules():
+    """
+    Reload SCHEDULE_FILE on boot and re-arm pending jobs.
+    Jobs whose ETA passed while the server was down follow SCHED_CATCHUP:
+      - "skip":  mark missed
+      - "grace": send now if late by at most SCHED_CATCHUP_GRACE_MIN minutes, else mark missed
+      - "all":   send every missed job now
+    Catch-up sends are queued on SCHED_QUEUE, so startup does not wait on Discord.
+    Schedules with nothing left to send are dropped from memory and from the file.
+    """
+    try:
+        with open(SCHEDULE_FILE, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+    except FileNotFoundError:
+        return
+    except Exception as e:
+        print(f"[scheduler] could not read {SCHEDULE_FILE}: {e}")
+        return
+    if not isinstance(stored, dict):
+        return
+
+    now_ms = int(time.time() * 1000)
+    grace_ms = max(0, SCHED_CATCHUP_GRACE_MIN) * 60 * 1000
+    armed = caught_up = missed = dropped = 0
+    with SCHED_LOCK:
+        for sched_id, obj in stored.items():
+            jobs = obj.get("jobs") if isinstance(obj, dict) else None
+            if not jobs:
+                dropped += 1
+                continue
+            for idx, job in enumerate(jobs):
+                if job.get("status") != "pending":
+                    continue
+                eta_ms = int(job.get("eta_ms") or 0)
+                late_ms = now_ms - eta_ms
+                if eta_ms > now_ms:
+                    armed += 1
+                elif SCHED_CATCHUP == "all" or (SCHED_CATCHUP == "grace" and late_ms <= grace_ms):
+                    caught_up += 1
+                else:
+                    job["status"] = "missed"
+                    missed += 1
+            if not any(j.get("status") == "pending" for j in jobs):
+                dropped += 1
+                continue
+            obj["handles"] = []
+            SCHEDULES[sched_id] = obj
+            _index_add(sched_id)
+            for idx, job in enumerate(jobs):
+                if job.get("status") != "pending":
+                    continue
+                eta_ms = int(job.get("eta_ms") or 0)
+                args = (eta_ms, job.get("label", ""), obj.get("channel_id", ""), job.get("content", ""), sched_id, idx)
+                h = _schedule_one(*args, catchup=(eta_ms <= now_ms))
+                if h is None:
+                    # Came due since the restore started; send it as a catch-up rather than drop it
+                    h = _schedule_one(*args, catchup=True)
+                obj["handles"].append(h)
+        _persist_schedules()
+    print(f"[scheduler] restored: {armed} armed, {caught_up} queued for catch-up, {missed} missed, "
+          f"{dropped} finished schedules dropped (policy={SCHED_CATCHUP})")
+
+def _legacy_points(channel_id: str, drop_ts_ms: int, msg30: str, msg15: str, msg_live: str):
+    """Build T-30/T-15/LIVE points. Returns (schedule_points, messages, err)."""
     if not channel_id:
-        return None, [], "channel_id required"
+        return None, None, "channel_id required"
     if not drop_ts_ms or drop_ts_ms <= 0:
-        return None, [], "drop_ts_ms required"
+        return None, None, "drop_ts_ms required"
     if not msg_live:
-        return None, [], "msgLive required"
+        return None, None, "msgLive required"
 
     # Compute targets in ms
     M = 60 * 1000
@@ -726,41 +1534,16 @@ def schedule_drop(channel_id: str, drop_ts_ms: int, msg30: str, msg15: str, msg_
     if msg15:
         schedule_points.append(("T-15", drop_ts_ms - 15 * M, msg15))
     schedule_points.append(("LIVE", drop_ts_ms, msg_live))
+    return schedule_points, {"msg30": msg30, "msg15": msg15, "msgLive": msg_live}, None
 
-    timers = []
-    etas: List[dict] = []
-    sched_id = uuid.uuid4().hex
-
-    for label, eta_ms, content in schedule_points:
-        t = _schedule_one(eta_ms, label, channel_id, content, sched_id)
-        etas.append({"label": label, "eta_ms": int(eta_ms), "scheduled": bool(t)})
-        if t:
-            timers.append(t)
-
-    with SCHED_LOCK:
-        SCHEDULES[sched_id] = {
-            "channel_id": channel_id,
-            "drop_ts_ms": drop_ts_ms,
-            "timers": timers,
-            "messages": {"msg30": msg30, "msg15": msg15, "msgLive": msg_live},
-            "created_ms": int(time.time() * 1000),
-        }
-
-    return sched_id, etas, None
-
-def schedule_drop_custom(channel_id: str, drop_ts_ms: int, reminders: List[dict], msg_live: str):
-    """
-    reminders: [{"label":"T-30","offset_min":30,"content":"..."}, ...]
-    - offset_min is minutes BEFORE drop (positive number). For at-drop, use 0.
-    - content may be blank to generate default header.
-    Returns (id, etas[], err)
-    """
+def _custom_points(channel_id: str, drop_ts_ms: int, reminders: List[dict], msg_live: str):
+    """Build LIVE + custom reminder points. Returns (schedule_points, messages, err)."""
     if not channel_id:
-        return None, [], "channel_id required"
+        return None, None, "channel_id required"
     if not drop_ts_ms or drop_ts_ms <= 0:
-        return None, [], "drop_ts_ms required"
+        return None, None, "drop_ts_ms required"
     if not msg_live:
-        return None, [], "msgLive required"
+        return None, None, "msgLive required"
 
     # Always include LIVE at T-0
     schedule_points = [("LIVE", drop_ts_ms, msg_live)]
@@ -773,39 +1556,102 @@ def schedule_drop_custom(channel_id: str, drop_ts_ms: int, reminders: List[dict]
         label = str(r.get("label") or f"T-{off_min}")
         content = str(r.get("content") or "").strip()
         eta = drop_ts_ms - max(0, off_min) * M
-        schedule_points.append((label, eta, content))
+        schedule_points.append((label, eta, content or label))
+    return schedule_points, {"reminders": reminders, "msgLive": msg_live}, None
 
-    timers = []
-    etas: List[dict] = []
-    sched_id = uuid.uuid4().hex
-
-    for label, eta_ms, content in schedule_points:
-        t = _schedule_one(eta_ms, label, channel_id, content or label, sched_id)
-        etas.append({"label": label, "eta_ms": int(eta_ms), "scheduled": bool(t)})
-        if t:
-            timers.append(t)
+def _points_from_request(data: dict):
+    """
+    Parse one /scheduler/schedule_drop style body (custom reminders or legacy msg30/msg15).
+    Returns (channel_id, drop_ts_ms, schedule_points, messages, err).
+    """
+    if not isinstance(data, dict):
+        return "", 0, None, None, "drop must be an object"
+    channel_id = str(data.get("channel_id", "")).strip()
+    drop_ts_ms = _safe_int(data.get("drop_ts_ms") or 0)
+    msg_live = str(data.get("msgLive", "") or "").strip()
+    reminders = data.get("reminders")
+    if isinstance(reminders, list) and reminders:
+        points, messages, err = _custom_points(channel_id, drop_ts_ms, reminders, msg_live)
+    else:
+        # backward compatibility with msg30/msg15 fields
+        msg30 = str(data.get("msg30", "") or "").strip()
+        msg15 = str(data.get("msg15", "") or "").strip()
+        points, messages, err = _legacy_points(channel_id, drop_ts_ms, msg30, msg15, msg_live)
+    return channel_id, drop_ts_ms, points, messages, err
 
-    with SCHED_LOCK:
-        SCHEDULES[sched_id] = {
-            "channel_id": channel_id,
-            "drop_ts_ms": drop_ts_ms,
-            "timers": timers,
-            "messages": {"reminders": reminders, "msgLive": msg_live},
-            "created_ms": int(time.time() * 1000),
-        }
+def schedule_drop(channel_id: str, drop_ts_ms: int, msg30: str, msg15: str, msg_live: str):
+    """
+    DEPRECATED: Use schedule_drop_custom() instead for more flexibility.
+    
+    Queue up to three sends: T-30min, T-15min, T-0min.
+    Only future ones will be scheduled. Returns (sched_id, etas[])
+    """
+    points, messages, err = _legacy_points(channel_id, drop_ts_ms, msg30, msg15, msg_live)
+    if err:
+        return None, [], err
+    sched_id, etas = _register_schedule(channel_id, drop_ts_ms, points, messages)
+    return sched_id, etas, None
 
+def schedule_drop_custom(channel_id: str, drop_ts_ms: int, reminders: List[dict], msg_live: str):
+    """
+    reminders: [{"label":"T-30","offset_min":30,"content":"..."}, ...]
+    - offset_min is minutes BEFORE drop (positive number). For at-drop, use 0.
+    - content may be blank to generate default header.
+    Returns (id, etas[], err)
+    """
+    points, messages, err = _custom_points(channel_id, drop_ts_ms, reminders, msg_live)
+    if err:
+        return None, [], err
+    sched_id, etas = _register_schedule(channel_id, drop_ts_ms, points, messages)
     return sched_id, etas, None
 
+def schedule_drop_batch(drops: List[dict]):
+    """
+    Validate every drop first, then persist and arm them all at once.
+    Nothing is scheduled if any drop is invalid. A drop is a duplicate only if
+    an earlier one has the same channel and the same reminders (labels, times
+    and content); same-time drops with different messages are both kept.
+    Returns (results[{id, channel_id, etas}], errors[{index, error}]).
+    """
+    if not isinstance(drops, list) or not drops:
+        return [], [{"index": None, "error": "drops must be a non-empty list"}]
+    if len(drops) > SCHED_BATCH_MAX:
+        return [], [{"index": None, "error": f"at most {SCHED_BATCH_MAX} drops per batch"}]
+
+    specs, errors, seen = [], [], {}
+    for i, item in enumerate(drops):
+        channel_id, drop_ts_ms, points, messages, err = _points_from_request(item)
+        if not err:
+            key = (channel_id, tuple(tuple(p) for p in points))
+            if key in seen:
+                err = f"duplicate of drop {seen[key]} (same channel, times and messages)"
+            else:
+                seen[key] = i
+        if err:
+            errors.append({"index": i, "error": err})
+            continue
+        specs.append((channel_id, drop_ts_ms, points, messages))
+    if errors:
+        return [], errors
+
+    registered = _register_schedules(specs)
+    results = [
+        {"id": sched_id, "channel_id": spec[0], "etas": etas}
+        for spec, (sched_id, etas) in zip(specs, registered)
+    ]
+    return results, []
+
 def cancel_schedule(sched_id: str):
     with SCHED_LOCK:
-        obj = SCHEDULES.pop(sched_id, None)
+        obj = None
+        if sched_id in SCHEDULES:
+            _index_remove(sched_id)
+            obj = SCHEDULES.pop(sched_id)
+            _persist_schedules()
     if not obj:
         return False
-    for t in obj.get("timers", []):
-        try:
-            t.cancel()
-        except Exception:
-            pass
+    for h in obj.get("handles", []):
+        SCHED_QUEUE.cancel(h)
     return True
 
 
@@ -836,22 +1682,26 @@ class Handler(http.server.SimpleHTTPRequestHandler):
             return self._ok(info)
 
         elif path == "/load_settings":
-            try:
-                with open(STATE_FILE, "r", encoding="utf-8") as f:
-                    obj = json.load(f)  # read as dict so _ok can json.dumps it
-                return self._ok(obj)
-            except FileNotFoundError:
-                return self._ok({})
+            return self._ok(STATE.snapshot())
+
+        elif path == "/scheduler/list":
+            q = parse_qs(self.path.split("?", 1)[1] if "?" in self.path else "")
+            channel_id = (q.get("channel_id") or [""])[0].strip()
+            sched_id = (q.get("id") or [""])[0].strip()
+            limit = max(1, min(_safe_int((q.get("limit") or ["50"])[0], 50), 500))
+            return self._ok(json_ok(
+                upcoming=list_upcoming(limit=limit, channel_id=channel_id, sched_id=sched_id),
+                schedules=[d for d in list_schedules(channel_id) if not sched_id or d["id"] == sched_id],
+            ))
 
         elif path in ("/discord_health", "/discord-health"):
-            try:
-                fetch_guild_channels()
-                data = {"status": "ok", "bot": BOT_STATUS}
+            health = discord_health()
+            if health["ok"]:
+                data = {"status": "ok", "source": health["source"], "bot": BOT_STATUS}
                 return self._ok(data)
-            except Exception as e:
-                data = json_err(str(e))
-                data["bot"] = BOT_STATUS
-                return self._ok(data, status=503)
+            data = json_err(health["error"])
+            data["bot"] = BOT_STATUS
+            return self._ok(data, status=503)
 
         # Fall back to static file serving (Daily.html, css/js, etc.)
         return super().do_GET()
@@ -862,17 +1712,24 @@ class Handler(http.server.SimpleHTTPRequestHandler):
 
         # --- Settings ---
         if path == "/save_settings":
-            try:
-                with open(STATE_FILE, "w", encoding="utf-8") as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                return self._ok(json_ok(saved=True))
-            except Exception as e:
-                return self._ok(json_err(e), status=500)
+            if not isinstance(data, dict):
+                return self._ok(json_err("Expected a JSON object"), status=400)
+            changed = STATE.replace(data)
+            return self._ok(json_ok(saved=True, changed=changed))
+
+        if path == "/patch_settings":
+            # Partial save: only the top-level sections in the body are replaced
+            if not isinstance(data, dict) or not data:
+                return self._ok(json_err("Expected a JSON object of sections"), status=400)
+            changed = STATE.patch(data)
+            return self._ok(json_ok(saved=True, changed=changed, sections=sorted(data)))
 
         # --- Discord: fetch channels & auto-save grouped lists ---
         if path == "/fetch_channels":
             try:
-                channels = fetch_guild_channels()
+                q = parse_qs(self.path.split("?", 1)[1] if "?" in self.path else "")
+                force = (q.get("refresh") or [""])[0].lower() in ("1", "true", "yes")
+                channels = get_guild_channels(force=force)
                 categorized = categorize_channels(channels)
                 autosave_state(categorized)
                 return self._ok(json_ok(**categorized))
@@ -890,22 +1747,26 @@ class Handler(http.server.SimpleHTTPRequestHandler):
 
         # --- Scheduler: schedule drop (supports custom reminders) ---
         if path == "/scheduler/schedule_drop":
-            channel_id = str(data.get("channel_id", "")).strip()
-            drop_ts_ms = int(data.get("drop_ts_ms") or 0)
-            msgLive= str(data.get("msgLive", "") or "").strip()
-
-            reminders = data.get("reminders")
-            if isinstance(reminders, list) and reminders:
-                sched_id, etas, err = schedule_drop_custom(channel_id, drop_ts_ms, reminders, msgLive)
-            else:
-                # backward compatibility with msg30/msg15 fields
-                msg30  = str(data.get("msg30", "") or "").strip()
-                msg15  = str(data.get("msg15", "") or "").strip()
-                sched_id, etas, err = schedule_drop(channel_id, drop_ts_ms, msg30, msg15, msgLive)
+            channel_id, drop_ts_ms, points, messages, err = _points_from_request(data)
             if err:
                 return self._ok(json_err(err), status=400)
+            sched_id, etas = _register_schedule(channel_id, drop_ts_ms, points, messages)
             return self._ok(json_ok(id=sched_id, etas=etas))
 
+        # --- Scheduler: whole-day agenda in one request ---
+        if path == "/scheduler/schedule_batch":
+            # Accept {"drops": [...]} or a bare JSON array of drops
+            if isinstance(data, list):
+                drops = data
+            elif isinstance(data, dict):
+                drops = data.get("drops")
+            else:
+                return self._ok(json_err("Expected {\"drops\": [...]} or a JSON array of drops"), status=400)
+            results, errors = schedule_drop_batch(drops)
+            if errors:
+                return self._ok(json_err("validation failed; nothing scheduled", errors=errors), status=400)
+            return self._ok(json_ok(results=results))
+
         # --- Scheduler: cancel ---
         if path == "/scheduler/cancel":
             sched_id = str(data.get("id", "")).strip()
@@ -937,11 +1798,14 @@ def run_server():
         print("  GET  /health")
         print("  GET  /load_settings")
         print("  POST /save_settings")
+        print("  POST /patch_settings")
         print("  POST /fetch_channels")
         print("  GET  /discord_health  (alias: /discord-health)")
         print("  POST /discord/send_message")
         print("  POST /scheduler/schedule_drop")
+        print("  POST /scheduler/schedule_batch")
         print("  POST /scheduler/cancel")
+        print("  GET  /scheduler/list?channel_id=&id=&limit=")
         print("Press CTRL+C to stop.")
         httpd.serve_forever()
 
@@ -953,4 +1817,7 @@ if __name__ == "__main__":
         start_discord_bot()
     except Exception as _e:
         BOT_STATUS.update({"online": False, "error": str(_e)[:200]})
+    start_channel_refresher()
+    # Re-arm schedules that survived a restart
+    restore_schedules()
     run_server()
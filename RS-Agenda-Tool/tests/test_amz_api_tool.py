@@ -0,0 +1,216 @@
+import os
+import sys
+import tempfile
+import time
+
+# Keep the tool's on-disk stores out of src/ while testing
+_TMP = tempfile.mkdtemp(prefix="paapi-test-")
+os.environ.setdefault("LINK_CACHE_FILE", "")
+os.environ.setdefault("HISTORY_DB", ":memory:")
+os.environ.setdefault("WATCH_FILE", os.path.join(_TMP, "watchlist.json"))
+os.environ.setdefault("WATCH_LOG_FILE", os.path.join(_TMP, "price_events.log"))
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+import amz_api_tool as paapi  # noqa: E402
+
+
+def test_text_mode_extracts_only_links_and_asins():
+    text = ("Deals today: headphones everything B0C6HT9RYM (https://amzn.to/3xYz), "
+            "book 030640615X and https://www.amazon.com/dp/B000000001. lowercase b0c6ht9rym")
+    assert paapi._links_from_text(text) == [
+        "B0C6HT9RYM",
+        "https://amzn.to/3xYz",
+        "030640615X",
+        "https://www.amazon.com/dp/B000000001",
+    ]
+
+
+def test_bulk_text_does_not_send_words_to_paapi(monkeypatch):
+    sent = []
+
+    def fake_post(target, body):
+        sent.extend(body["ItemIds"])
+        return {"ItemsResult": {"Items": [{"ASIN": a} for a in body["ItemIds"]]}}
+
+    monkeypatch.setattr(paapi, "paapi_post", fake_post)
+    code, payload = paapi.handle_price_links("headphones everything B0TEST0001 wireless", fresh=True)
+    assert code == 200
+    assert [r["asin"] for r in payload["results"]] == ["B0TEST0001"]
+    assert sent == ["B0TEST0001"]
+
+
+def test_next_search_page_is_prefetched_after_uncached_page(monkeypatch):
+    throttle = paapi.PaapiThrottle(1, 8640, 10.0)   # default quota: one call per second
+    monkeypatch.setattr(paapi, "PAAPI_THROTTLE", throttle)
+    monkeypatch.setattr(paapi, "SEARCH_PREFETCH", True)
+    pages = []
+
+    def fake_post(target, body):
+        assert throttle.acquire()
+        pages.append(body["ItemPage"])
+        return {"SearchResult": {"TotalResultCount": 35,
+                                 "Items": [{"ASIN": "B0PAGE%04d" % body["ItemPage"]}]}}
+
+    monkeypatch.setattr(paapi, "paapi_post", fake_post)
+    code, first = paapi.handle_search_items({"keywords": "prefetch   test"})
+    assert code == 200 and first["hasNextPage"]
+
+    for fut in list(paapi._SEARCH_PREFETCHING.values()):
+        fut.result(timeout=5)
+    assert pages == [1, 2]
+
+    monkeypatch.setattr(paapi, "SEARCH_PREFETCH", False)
+    code, second = paapi.handle_search_items({"keywords": "prefetch test", "page": 2})
+    assert code == 200 and second["results"][0]["asin"] == "B0PAGE0002"
+    assert pages == [1, 2]   # served from the prefetched cache entry
+
+
+def test_history_rejects_bad_days():
+    for days in ("abc", "nan", "inf", "-inf", "0", "-3"):
+        for series in (False, True):
+            code, payload = paapi.handle_history({"asin": ["B0C6HT9RYM"], "days": [days]}, series=series)
+            assert code == 400, (days, series)
+            assert payload["error"]["code"] == "BAD_REQUEST"
+    code, payload = paapi.handle_history({"asin": ["short"]})
+    assert code == 400 and payload["error"]["code"] == "ASIN_INVALID"
+
+
+def test_history_keeps_first_sample_within_a_second():
+    history = paapi.PriceHistory(":memory:")
+    history.record("B0HIST0001", {"price": 1000}, ts=1_700_000_000)
+    history.record("B0HIST0001", {"price": 900}, ts=1_700_000_000)
+    history.record("B0HIST0001", {"price": 800}, ts=1_700_000_001)
+    rows = history.db.execute("SELECT ts, price FROM samples WHERE asin = ? ORDER BY ts", ("B0HIST0001",)).fetchall()
+    assert rows == [(1_700_000_000, 1000), (1_700_000_001, 800)]
+
+
+def test_history_rejects_non_numeric_bucket():
+    code, payload = paapi.handle_history({"asin": ["B0C6HT9RYM"], "bucket": ["abc"]}, series=True)
+    assert code == 400
+    assert payload["error"]["code"] == "BAD_REQUEST"
+    code, payload = paapi.handle_history({"asin": ["B0C6HT9RYM"], "bucket": ["3600"]}, series=True)
+    assert code == 200 and payload["points"] == []
+
+
+def test_watch_list_is_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(paapi, "WATCH_MAX", 2)
+    watcher = paapi.PriceWatcher(str(tmp_path / "watch.json"))
+    monkeypatch.setattr(paapi, "PRICE_WATCHER", watcher)
+    code, _ = paapi.handle_watch_update({"asins": ["B0WATCH001", "B0WATCH002"]})
+    assert code == 200
+    code, payload = paapi.handle_watch_update({"asins": ["B0WATCH003"]})
+    assert code == 400 and payload["error"]["code"] == "WATCH_FULL"
+    assert sorted(watcher.list()["asins"]) == ["B0WATCH001", "B0WATCH002"]
+
+
+def test_watch_poll_sends_chunks_one_at_a_time(tmp_path, monkeypatch):
+    throttle = paapi.PaapiThrottle(5, 8640, 0.0)   # fail fast: any queued call would be rejected
+    monkeypatch.setattr(paapi, "PAAPI_THROTTLE", throttle)
+    monkeypatch.setattr(paapi, "WATCH_DAY_RESERVE", 0)
+    monkeypatch.setattr(paapi, "WATCH_MAX", 1000)
+    calls = []
+
+    def fake_fetch(asins, fresh=False):
+        assert throttle.acquire()
+        calls.append(len(asins))
+        return {a: {"ItemsResult": {"Items": [{"ASIN": a}]}} for a in asins}
+
+    monkeypatch.setattr(paapi, "fetch_items", fake_fetch)
+    watcher = paapi.PriceWatcher(str(tmp_path / "watch.json"))
+    assert watcher.add(["B0W%07d" % i for i in range(65)])
+    watcher.poll()
+    assert calls == [10, 10, 10, 10, 10, 10, 5]   # more chunks than the burst allows
+    assert throttle.stats()["rejected"] == 0
+    assert all(snap is not None for snap in watcher.list()["asins"].values())
+    assert [p.name for p in tmp_path.iterdir()] == ["watch.json"]
+
+
+def test_bulk_paste_writes_link_cache_once(tmp_path, monkeypatch):
+    resolver = paapi.LinkResolver(str(tmp_path / "links.json"))
+    monkeypatch.setattr(paapi, "LINK_RESOLVER", resolver)
+    monkeypatch.setattr(paapi, "_resolve_final_url",
+                        lambda link: "https://www.amazon.com/dp/B0LINK%04d" % int(link.rsplit("/", 1)[1]))
+    writes = []
+    real_write = paapi._write_json_atomic
+    monkeypatch.setattr(paapi, "_write_json_atomic", lambda path, data: (writes.append(len(data)), real_write(path, data)))
+    monkeypatch.setattr(paapi, "paapi_post", lambda target, body: {
+        "ItemsResult": {"Items": [{"ASIN": a} for a in body["ItemIds"]]}})
+
+    links = ["https://amzn.to/%d" % i for i in range(20)]
+    code, payload = paapi.handle_price_links(links, fresh=True)
+    assert code == 200 and len(payload["results"]) == 20
+    assert writes == [20]
+    assert resolver._save_timer is None
+    resolver.flush()   # nothing new to write
+    assert writes == [20]
+
+
+def test_get_items_many_gives_every_entry_a_status(monkeypatch):
+    monkeypatch.setattr(paapi, "paapi_post", lambda target, body: {
+        "ItemsResult": {"Items": [{"ASIN": a} for a in body["ItemIds"]]}})
+    code, payload = paapi.handle_get_items_many(["B0MANY0001", "bad", "b0many0001"], fresh=True)
+    assert code == 200
+    assert [(r["asin"], r["status"]) for r in payload["results"]] == [
+        ("B0MANY0001", 200), ("BAD", 400), ("B0MANY0001", 200)]
+    assert payload["results"][1]["error"]["code"] == "ASIN_INVALID"
+
+
+def test_batcher_groups_concurrent_lookups_into_chunks(monkeypatch):
+    calls = []
+
+    def fake_post(target, body):
+        calls.append(list(body["ItemIds"]))
+        return {"ItemsResult": {"Items": [{"ASIN": a} for a in body["ItemIds"] if a != "B0BATCH011"]},
+                "Errors": [{"Code": "InvalidParameterValue", "Message": "ItemId B0BATCH011 is not accessible"}]}
+
+    monkeypatch.setattr(paapi, "paapi_post", fake_post)
+    batcher = paapi.GetItemsBatcher(0.05)
+    asins = ["B0BATCH%03d" % i for i in range(12)]
+    first = batcher.submit(asins[0])
+    assert batcher.submit(asins[0]) is first   # a waiting lookup is shared
+    futures = [first] + [batcher.submit(a) for a in asins[1:]]
+    results = [f.result(timeout=5) for f in futures]
+
+    assert sorted(len(c) for c in calls) == [2, 10]
+    assert sorted(a for c in calls for a in c) == asins
+    assert results[0] == {"ItemsResult": {"Items": [{"ASIN": "B0BATCH000"}]}}
+    assert results[11] == {"Errors": [{"Code": "InvalidParameterValue",
+                                       "Message": "ItemId B0BATCH011 is not accessible"}]}
+
+
+def test_batcher_hands_errors_to_every_waiter(monkeypatch):
+    monkeypatch.setattr(paapi, "paapi_post", lambda target, body: {
+        "error": {"code": "CLIENT_THROTTLED", "message": "slow down"}})
+    batcher = paapi.GetItemsBatcher(0.01)
+    futures = [batcher.submit("B0ERROR%03d" % i) for i in range(3)]
+    assert all(f.result(timeout=5)["error"]["code"] == "CLIENT_THROTTLED" for f in futures)
+
+    def boom(target, body):
+        raise RuntimeError("socket closed")
+    monkeypatch.setattr(paapi, "paapi_post", boom)
+    fut = batcher.submit("B0ERROR999")
+    assert fut.result(timeout=5)["error"] == {"code": "INTERNAL_ERROR", "message": "socket closed"}
+
+
+def test_throttle_paces_and_rejects_past_max_wait():
+    throttle = paapi.PaapiThrottle(2, 8640, 0.0)
+    assert throttle.acquire() and throttle.acquire()
+    assert not throttle.acquire()   # the next slot is 0.5s away and max_wait is 0
+    assert throttle.stats()["granted"] == 2 and throttle.stats()["rejected"] == 1
+
+    queued = paapi.PaapiThrottle(2, 8640, 1.0)
+    queued.acquire(), queued.acquire()
+    started = time.monotonic()
+    assert queued.acquire()
+    assert 0.3 < time.monotonic() - started < 1.0
+
+
+def test_throttle_day_quota_and_reserve():
+    throttle = paapi.PaapiThrottle(100, 3, 10.0)
+    assert throttle.has_headroom(day_reserve=1)
+    assert throttle.acquire() and throttle.acquire()
+    assert not throttle.has_headroom(day_reserve=1)
+    assert throttle.has_headroom()
+    assert throttle.acquire()
+    assert not throttle.acquire()   # next daily token is hours away
+    assert throttle.stats()["day_remaining"] == 0
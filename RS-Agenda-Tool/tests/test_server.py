@@ -0,0 +1,292 @@
+import asyncio
+import os
+import sys
+import time
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+import server  # noqa: E402
+
+
+# ---- Minimal stand-in for discord.py: just enough for start_discord_bot() ----
+class _FakeBot:
+    def __init__(self, *args, **kwargs):
+        self.events = {}
+        self.user = types.SimpleNamespace(name="agenda-bot", id=42)
+        self.latency = 0.05
+        self.guild = None
+        self._ready = False
+        self._closed = False
+
+    def event(self, fn):
+        self.events[fn.__name__] = fn
+        return fn
+
+    def command(self, *args, **kwargs):
+        return lambda fn: fn
+
+    async def change_presence(self, **kwargs):
+        return None
+
+    def get_guild(self, gid):
+        return self.guild
+
+    def is_ready(self):
+        return self._ready
+
+    def is_closed(self):
+        return self._closed
+
+    def run(self, token):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(self.events["on_ready"]())
+        self._ready = True
+        loop.run_forever()
+
+
+def _channel(cid, parent, name, position=0):
+    return types.SimpleNamespace(id=cid, type=types.SimpleNamespace(value=0), category_id=parent,
+                                 name=name, position=position)
+
+
+@pytest.fixture
+def fake_bot(monkeypatch):
+    discord = types.ModuleType("discord")
+    discord.Intents = types.SimpleNamespace(default=lambda: types.SimpleNamespace())
+    for name in ("Embed", "File", "Game", "Guild"):
+        setattr(discord, name, type(name, (), {"__init__": lambda self, *a, **k: None}))
+    ext = types.ModuleType("discord.ext")
+    commands = types.ModuleType("discord.ext.commands")
+    commands.Bot = _FakeBot
+    commands.Context = object
+    ext.commands = commands
+    discord.ext = ext
+    monkeypatch.setitem(sys.modules, "discord", discord)
+    monkeypatch.setitem(sys.modules, "discord.ext", ext)
+    monkeypatch.setitem(sys.modules, "discord.ext.commands", commands)
+
+    guild = types.SimpleNamespace(id=1234, channels=[
+        _channel(11, int(server.CAT_DAILY), "daily-b", 2),
+        _channel(12, int(server.CAT_DAILY), "daily-a", 1),
+    ])
+    monkeypatch.setattr(_FakeBot, "get_guild", lambda self, gid: guild if gid == 1234 else None)
+    monkeypatch.setattr(server, "DISCORD_BOT_TOKEN", "test-token")
+    monkeypatch.setattr(server, "DISCORD_GUILD_ID", "1234")
+    monkeypatch.setattr(server, "_BOT_STARTED", False)
+    monkeypatch.setattr(server, "BOT_CLIENT", None)
+    monkeypatch.setattr(server, "BOT_LOOP", None)
+    monkeypatch.setattr(server, "CHANNEL_DIR_READY", False)
+    server.CHANNEL_DIR.clear()
+
+    server.start_discord_bot()
+    deadline = time.time() + 5
+    while not server._bot_ready() and time.time() < deadline:
+        time.sleep(0.01)
+    yield server.BOT_CLIENT
+    if server.BOT_LOOP is not None:
+        server.BOT_LOOP.call_soon_threadsafe(server.BOT_LOOP.stop)
+
+
+def test_bot_client_is_set_after_start(fake_bot):
+    assert server.BOT_CLIENT is not None
+    assert isinstance(server.BOT_CLIENT, _FakeBot)
+    assert server._bot_ready()
+
+
+def test_gateway_directory_serves_channels_without_rest(fake_bot, monkeypatch):
+    def _no_rest():
+        raise AssertionError("REST fetch while the gateway directory is live")
+    monkeypatch.setattr(server, "fetch_guild_channels", _no_rest)
+
+    channels = server.get_guild_channels()
+    assert [c["name"] for c in channels] == ["daily-a", "daily-b"]
+    categorized = server.categorize_channels(channels)
+    assert [c["id"] for c in categorized["daily"]] == ["12", "11"]
+
+    server.gateway_channel_upsert(_channel(13, int(server.CAT_DAILY), "daily-c", 3))
+    server.gateway_channel_remove(11)
+    assert [c["id"] for c in server.get_guild_channels(force=True)] == ["12", "13"]
+
+
+
+def test_discord_health_uses_gateway(fake_bot, monkeypatch):
+    monkeypatch.setattr(server, "fetch_guild_channels", lambda: pytest.fail("REST call from health"))
+    health = server.discord_health()
+    assert health == {"ok": True, "source": "gateway"}
+    assert server.BOT_STATUS["latency_ms"] == 50
+
+
+def test_channel_refresher_skips_rest_while_gateway_live(fake_bot, monkeypatch):
+    calls = []
+    monkeypatch.setattr(server, "fetch_guild_channels", lambda: calls.append(1) or [])
+    server.start_channel_refresher()
+    time.sleep(0.2)
+    assert calls == []
+
+
+def test_state_store_concurrent_flushes_keep_latest(tmp_path):
+    import json
+    import threading
+
+    store = server.AgendaStateStore(str(tmp_path / "agenda_data.json"), debounce_sec=60)
+    for i in range(50):
+        store.patch({"output": f"v{i}"})
+        threads = [threading.Thread(target=store.flush) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    store.patch({"output": "final"})
+    store.flush()
+    assert json.loads((tmp_path / "agenda_data.json").read_text(encoding="utf-8")) == {"output": "final"}
+    assert store.saved_version == store.version
+    assert [p.name for p in tmp_path.iterdir()] == ["agenda_data.json"]
+    if store.timer:
+        store.timer.cancel()
+
+
+def test_restore_queues_catchup_and_drops_finished_schedules(tmp_path, monkeypatch):
+    import json
+    import threading
+
+    now_ms = int(time.time() * 1000)
+    sched_file = tmp_path / "schedules.json"
+    sched_file.write_text(json.dumps({
+        "done": {"channel_id": "1", "jobs": [{"label": "LIVE", "eta_ms": now_ms - 60_000, "status": "sent"}]},
+        "late": {"channel_id": "2", "jobs": [
+            {"label": "T-15", "eta_ms": now_ms - 60_000, "content": "soon", "status": "pending"},
+            {"label": "LIVE", "eta_ms": now_ms + 3_600_000, "content": "live", "status": "pending"},
+        ]},
+    }), encoding="utf-8")
+    monkeypatch.setattr(server, "SCHEDULE_FILE", str(sched_file))
+    monkeypatch.setattr(server, "SCHED_CATCHUP", "grace")
+    monkeypatch.setattr(server, "SCHEDULES", {})
+    monkeypatch.setattr(server, "SCHED_UPCOMING", [])
+    monkeypatch.setattr(server, "SCHED_BY_CHANNEL", {})
+
+    release = threading.Event()
+    sent = []
+
+    def slow_send(channel_id, content):
+        release.wait(5)
+        sent.append((channel_id, content))
+        return {"id": "m1"}
+    monkeypatch.setattr(server, "send_discord_message", slow_send)
+
+    started = time.time()
+    server.restore_schedules()
+    assert time.time() - started < 1   # catch-up is queued, not sent inline
+    assert sorted(json.loads(sched_file.read_text(encoding="utf-8"))) == ["late"]
+
+    release.set()
+    deadline = time.time() + 5
+    while not sent and time.time() < deadline:
+        time.sleep(0.01)
+    assert sent == [("2", "soon")]
+    for h in server.SCHEDULES["late"]["handles"]:
+        server.SCHED_QUEUE.cancel(h)
+
+
+def test_job_queue_runs_due_jobs_and_cancels_pending_ones():
+    import threading
+
+    queue = server._JobQueue(2)
+    ran = []
+    done = threading.Event()
+    now_ms = int(time.time() * 1000)
+    cancelled = queue.push(now_ms + 100, lambda: ran.append("cancelled"))
+    queue.push(now_ms + 150, lambda: (ran.append("later"), done.set()))
+    fired = queue.push(now_ms, lambda: ran.append("now"))
+    queue.cancel(cancelled)
+
+    assert done.wait(5)
+    assert ran == ["now", "later"]
+    # Cancelling jobs that already ran leaves no bookkeeping behind
+    queue.cancel(fired)
+    queue.cancel(cancelled)
+    assert queue._cancelled == set() and queue._live == set() and queue._heap == []
+
+
+def test_schedule_with_only_past_jobs_is_not_stored(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "SCHEDULE_FILE", str(tmp_path / "schedules.json"))
+    monkeypatch.setattr(server, "SCHEDULES", {})
+    monkeypatch.setattr(server, "SCHED_UPCOMING", [])
+    monkeypatch.setattr(server, "SCHED_BY_CHANNEL", {})
+
+    past_drop = int(time.time() * 1000) - 3_600_000
+    sched_id, etas, err = server.schedule_drop_custom(
+        "55", past_drop, [{"label": "T-30", "offset_min": 30, "content": "soon"}], "live")
+    assert err is None and sched_id is None
+    assert etas and not any(e["scheduled"] for e in etas)
+    assert server.SCHEDULES == {}
+    assert server.list_schedules("55") == []
+
+
+def _post(httpd, path, body):
+    import json
+    import urllib.error
+    import urllib.request
+
+    req = urllib.request.Request(f"http://127.0.0.1:{httpd.server_address[1]}{path}",
+                                 data=json.dumps(body).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=5) as res:
+            return res.status, json.loads(res.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.fixture
+def http_server(tmp_path, monkeypatch):
+    import http.server
+    import threading
+
+    monkeypatch.setattr(server, "SCHEDULE_FILE", str(tmp_path / "schedules.json"))
+    monkeypatch.setattr(server, "SCHEDULES", {})
+    monkeypatch.setattr(server, "SCHED_UPCOMING", [])
+    monkeypatch.setattr(server, "SCHED_BY_CHANNEL", {})
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), server.Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    for obj in list(server.SCHEDULES.values()):
+        for h in obj.get("handles") or []:
+            server.SCHED_QUEUE.cancel(h)
+
+
+def test_schedule_batch_accepts_a_bare_array(http_server):
+    drop = int(time.time() * 1000) + 7_200_000
+    drops = [
+        {"channel_id": "7", "drop_ts_ms": drop, "msgLive": "live A"},
+        {"channel_id": "7", "drop_ts_ms": drop, "msgLive": "live B"},   # same slot, different message
+    ]
+    code, body = _post(http_server, "/scheduler/schedule_batch", drops)
+    assert code == 200 and len(body["results"]) == 2
+
+    code, body = _post(http_server, "/scheduler/schedule_batch", {"drops": [drops[0], dict(drops[0])]})
+    assert code == 400
+    assert body["errors"][0]["index"] == 1 and "duplicate" in body["errors"][0]["error"]
+
+    code, body = _post(http_server, "/scheduler/schedule_batch", "not drops")
+    assert code == 400
+
+
+def test_cancel_schedule_stops_pending_sends(http_server, monkeypatch):
+    sent = []
+    monkeypatch.setattr(server, "send_discord_message", lambda cid, content: sent.append(content) or {"id": "m"})
+    now_ms = int(time.time() * 1000)
+    sched_id, etas = server._register_schedule(
+        "9", now_ms + 300, [("T-0", now_ms + 200, "first"), ("LIVE", now_ms + 300, "second")], {})
+    assert all(e["scheduled"] for e in etas)
+
+    code, body = _post(http_server, "/scheduler/cancel", {"id": sched_id})
+    assert code == 200 and body["cancelled"]
+    time.sleep(0.5)
+    assert sent == []
+    assert server.list_schedules("9") == []
+    code, body = _post(http_server, "/scheduler/cancel", {"id": sched_id})
+    assert code == 404